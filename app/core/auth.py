@@ -1,15 +1,23 @@
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import List
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import SessionLocal
+from app.core.database import AsyncSessionLocal, SessionLocal
 from app.models.user import User
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.cache import TTLCache
+from app.core.revocation import revocation_list
+from app.core.roles import parse_roles, roles_mask, role_names
+from app.core import hashing
 
 # =====================
 # CONFIG
@@ -21,10 +29,20 @@ ACCESS_TOKEN_EXPIRE_MINUTES = settings.JWT_EXPIRE_MINUTES
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-pwd_context = CryptContext(
-    schemes=["pbkdf2_sha256"],
-    deprecated="auto"
-)
+# (username, sha256 del token) -> TokenData; evita la consulta a BD en cada petición
+principal_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL)
+
+# sha256 del token -> claims verificados (hasta su exp, como mucho un día) / tokens rechazados hace poco
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=24 * 3600.0)
+rejected_tokens = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_NEGATIVE_CACHE_TTL)
+metrics.register_callback(
+    "auth_cache_hits_total", "counter", "Usuarios resueltos desde la caché", lambda: principal_cache.hits)
+metrics.register_callback(
+    "auth_cache_misses_total", "counter", "Usuarios resueltos con consulta a BD", lambda: principal_cache.misses)
+metrics.register_callback(
+    "token_cache_hits_total", "counter", "Tokens aceptados sin repetir jwt.decode", lambda: token_cache.hits)
+metrics.register_callback(
+    "token_cache_misses_total", "counter", "Tokens verificados con jwt.decode", lambda: token_cache.misses)
 
 # =====================
 # DB
@@ -41,11 +59,16 @@ def get_db():
 # PASSWORDS
 # =====================
 
+# Versiones síncronas para scripts; las rutas usan las *_async (pool de procesos)
+
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return hashing.hash_password(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return hashing.verify_password(plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await hashing.hash_password_async(password)
 
 # =====================
 # AUTH
@@ -55,14 +78,37 @@ def authenticate_user(db: Session, username: str, password: str):
     user = db.query(User).filter(User.username == username).first()
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    valid, new_hash = hashing.verify_and_update(password, user.password_hash)
+    if not valid:
+        return None
+    if new_hash:
+        # Hash con parámetros antiguos: se sustituye ahora que tenemos la contraseña
+        user.password_hash = new_hash
+        db.commit()
+    return user
+
+async def get_user_by_username(db: AsyncSession, username: str) -> User | None:
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalar_one_or_none()
+
+async def authenticate_user_async(db: AsyncSession, username: str, password: str):
+    """Como authenticate_user, con BD asíncrona y verificación en el pool de hashing"""
+    user = await get_user_by_username(db, username)
+    if not user:
+        return None
+    valid, new_hash = await hashing.verify_and_update_async(password, user.password_hash)
+    if not valid:
         return None
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
     return user
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
+    # iat con decimales: un token emitido justo después de revocar al usuario sigue siendo válido
+    to_encode.update({"exp": expire, "iat": time.time(), "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 # =====================
@@ -70,42 +116,105 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
 # =====================
 
 class TokenData:
-    def __init__(self, username: str, roles: List[str]):
+    def __init__(self, username: str, roles: str, jti: str | None = None, exp: float | None = None):
+        """
+        Args:
+            roles: roles separados por coma tal y como se guardan en User.roles
+            jti, exp: identificador y caducidad del token (para revocarlo)
+        """
         self.username = username
-        self.roles = roles
-
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> TokenData:
+        # Se parsean una vez: el resto de la petición usa la máscara
+        self.role_mask = parse_roles(roles)
+        self.roles = role_names(self.role_mask)
+        self.jti = jti
+        self.exp = exp
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
+    started = time.perf_counter()
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Token inválido",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str | None = payload.get("sub")
-        roles = payload.get("roles", "").split(",")
-        if username is None:
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(digest)
+    if payload is None:
+        if rejected_tokens.get(digest):
+            raise credentials_exception
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            rejected_tokens.set(digest, True)
             raise credentials_exception
-    except JWTError:
+        # Claims ya verificados: válidos hasta su exp sin repetir el HMAC
+        exp = payload.get("exp")
+        token_cache.set(digest, payload, time.monotonic() + (exp - time.time()) if exp else None)
+
+    username: str | None = payload.get("sub")
+    if username is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
+    jti, exp = payload.get("jti"), payload.get("exp")
+    if revocation_list.needs_refresh():
+        await revocation_list.refresh()
+    if revocation_list.is_revoked(username, jti, payload.get("iat")):
         raise credentials_exception
 
-    return TokenData(username=user.username, roles=user.roles)
+    if settings.AUTH_MODE == "stateless":
+        # Se confía en los claims firmados: sin consulta a BD
+        principal = TokenData(username, payload.get("roles") or "", jti, exp)
+    else:
+        key = (username, digest)
+        principal = principal_cache.get(key)
+        if principal is None:
+            # La sesión solo se abre si el usuario no está en caché
+            async with AsyncSessionLocal() as db:
+                user = await get_user_by_username(db, username)
+            if user is None:
+                raise credentials_exception
+            principal = TokenData(user.username, user.roles, jti, exp)
+            # Nunca más allá de la caducidad del propio token
+            expires_at = time.monotonic() + (exp - time.time()) if exp else None
+            principal_cache.set(key, principal, expires_at)
+
+    # JWT + consulta a BD: permite separar el coste de auth del de RCON
+    metrics.observe("auth_seconds", time.perf_counter() - started)
+    return principal
+
+
+async def invalidate_principal(db: AsyncSession, username: str) -> None:
+    """
+    Tras cambiar los roles o la contraseña de un usuario, o borrarlo.
+
+    Descarta sus entradas de la caché y, en modo stateless (donde los roles
+    viajan en el token), revoca todos los tokens que tenga emitidos. En
+    modo db deja un aviso en token_revocations para que el resto de
+    workers lo descarte también de su caché al refrescar la lista.
+    """
+    _forget_principal(username)
+    if settings.AUTH_MODE == "stateless":
+        await revocation_list.revoke_user(db, username)
+    else:
+        await revocation_list.notify_user_change(db, username)
+
+
+def _forget_principal(username: str) -> None:
+    principal_cache.invalidate_where(lambda key: key[0] == username)
+
+
+revocation_list.on_user_change(_forget_principal)
 
 # =====================
 # ROLES
 # =====================
 
 def require_roles(required_roles: list[str]):
-    def checker(user: TokenData = Depends(get_current_user)):
-        if not any(role in user.roles for role in required_roles):
+    required_mask = roles_mask(required_roles)
+
+    # async: comprobar una máscara no necesita un hilo del threadpool
+    async def checker(user: TokenData = Depends(get_current_user)):
+        if not user.role_mask & required_mask:
             raise HTTPException(
                 status_code=403,
                 detail="Permisos insuficientes"
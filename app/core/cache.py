@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlightCache:
+    """
+    Caché de un solo valor con coalescencia de peticiones.
+
+    - Mientras el valor tiene menos de `ttl` segundos se sirve directamente.
+    - Entre `ttl` y `ttl + stale_ttl` se sirve el valor antiguo y se lanza
+      una única recarga en segundo plano (stale-while-revalidate).
+    - Sin valor, o más antiguo que eso, todos los llamantes concurrentes
+      esperan a la misma carga en vuelo en lugar de lanzar una cada uno.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float = 1.0,
+        stale_ttl: float = 10.0,
+    ):
+        self.loader = loader
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+        self._value: Any = None
+        self._loaded_at: Optional[float] = None
+        self._inflight: Optional[asyncio.Future] = None
+        # Se incrementa al invalidar para descartar cargas iniciadas antes
+        self._generation = 0
+
+    def age(self) -> Optional[float]:
+        if self._loaded_at is None:
+            return None
+        return time.monotonic() - self._loaded_at
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._value = None
+        self._loaded_at = None
+        self._inflight = None
+
+    def _start_load(self) -> asyncio.Future:
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._load(self._generation))
+        return self._inflight
+
+    async def _load(self, generation: int) -> Any:
+        try:
+            value = await self.loader()
+        finally:
+            if generation == self._generation:
+                self._inflight = None
+        if generation == self._generation:
+            self._value = value
+            self._loaded_at = time.monotonic()
+        return value
+
+    async def get(self) -> Tuple[Any, float]:
+        """Devuelve (valor, antigüedad en segundos)"""
+        age = self.age()
+        if age is not None:
+            if age < self.ttl:
+                return self._value, age
+            if age < self.ttl + self.stale_ttl:
+                refresh = self._start_load()
+                # Evita el aviso de "exception was never retrieved" si la
+                # recarga en segundo plano falla
+                refresh.add_done_callback(_consume_exception)
+                return self._value, age
+
+        # shield: si un llamante se cancela no cancela la carga de los demás
+        value = await asyncio.shield(self._start_load())
+        return value, 0.0
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
+
+
+class TTLCache:
+    """
+    Caché LRU acotada con caducidad por entrada.
+
+    Segura entre hilos: las dependencias síncronas de FastAPI se ejecutan
+    en el threadpool. Las entradas caducan a los `ttl` segundos o antes si
+    se indica `expires_at` (monotonic) al guardarlas.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Valor guardado o None si no existe o ha caducado"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None) -> None:
+        deadline = time.monotonic() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        with self._lock:
+            self._data[key] = (deadline, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Elimina las entradas cuya clave cumple `predicate`; devuelve cuántas"""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
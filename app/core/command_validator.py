@@ -1,105 +1,275 @@
 from typing import List
-from typing import List, Dict 
+from typing import List, Dict, Optional, Pattern, Tuple
+from functools import lru_cache
+from pathlib import Path
+import json
+import logging
+import os
 import re
+import threading
+import time
 
+from app.core.config import settings
+from app.core.roles import ROLE_ADMIN, ROLE_OPERATOR
 
-# Comandos permitidos por rol
-ALLOWED_COMMANDS = {
-    "operator": [
-        r"^list$",
-        r"^say .+",
-        r"^msg \w+ .+",
-        r"^tell \w+ .+",
-        r"^whitelist add \w+",
-        r"^whitelist remove \w+",
-        r"^kick \w+.*",
-        r"^tp \w+ \w+",
-        r"^tp \w+ \d+ \d+ \d+",
-        r"^gamemode (survival|creative|adventure|spectator) \w+",
-        r"^time set (day|night|\d+)",
-        r"^weather (clear|rain|thunder)",
-        r"^give \w+ \w+ \d+",
-        r"^effect give \w+ \w+ \d+ \d+",
-        r"^effect clear \w+",
-        r"^teleport \w+ \w+",
-        r"^clear \w+",
-    ],
-    "admin": [
-        r"^stop$",
-        r"^save-all$",
-        r"^save-on$",
-        r"^save-off$",
-        r"^ban \w+.*",
-        r"^ban-ip \S+.*",
-        r"^pardon \w+",
-        r"^pardon-ip \S+",
-        r"^op \w+",
-        r"^deop \w+",
-        r"^seed$",
-        r"^difficulty (peaceful|easy|normal|hard)",
-        r"^whitelist (on|off|list|reload)",
-        r"^reload$",
-        r"^setblock \d+ \d+ \d+ \w+",
-        r"^fill \d+ \d+ \d+ \d+ \d+ \d+ \w+",
-    ]
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+DEFAULT_POLICY_FILE = Path(__file__).resolve().parent / "command_policy.json"
+
+# Grupos de la política que concede cada rol, por orden de precedencia.
+# Admin puede ejecutar todo; viewer no puede ejecutar comandos.
+ROLE_GRANTS = {
+    ROLE_ADMIN: ("operator", "admin"),
+    ROLE_OPERATOR: ("operator",),
 }
 
 
-def validate_command(command: str, user_roles: str) -> bool:
+# =====================
+# MATCHER COMPILADO
+# =====================
+
+# Verbo literal al inicio de cada patrón ("^whitelist add \w+" -> "whitelist")
+_VERB_RE = re.compile(r"^\^([a-z][a-z0-9_-]*)(?= |\$)")
+
+
+class CommandMatcher:
+    """
+    Allow-list compilada para un conjunto de roles.
+
+    Los patrones se agrupan por su primer token (el verbo) y cada grupo se
+    compila en una sola alternancia: validar un comando es una búsqueda en
+    un dict y un único `match`, en lugar de probar la lista entera patrón a
+    patrón. Los patrones sin verbo literal, o los comandos cuyo verbo no es
+    ASCII (IGNORECASE acepta equivalencias Unicode como "ſ" ~ "s"), usan la
+    alternancia completa para conservar exactamente la semántica de
+    `re.match(patrón, comando, re.IGNORECASE)`.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = list(patterns)
+        by_verb: Dict[str, List[str]] = {}
+        generic: List[str] = []
+        for pattern in self.patterns:
+            m = _VERB_RE.match(pattern)
+            if m:
+                by_verb.setdefault(m.group(1), []).append(pattern)
+            else:
+                generic.append(pattern)
+
+        self._generic = self._compile(generic)
+        self._by_verb: Dict[str, Pattern] = {
+            # Los genéricos pueden aceptar cualquier verbo: van en cada grupo
+            verb: self._compile(group + generic) for verb, group in by_verb.items()
+        }
+        self._all = self._compile(self.patterns)
+
+    @staticmethod
+    def _compile(patterns: List[str]) -> Optional[Pattern]:
+        if not patterns:
+            return None
+        return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+
+    def match(self, command: str) -> bool:
+        verb = command.split(" ", 1)[0]
+        if verb.isascii():
+            compiled = self._by_verb.get(verb.lower(), self._generic)
+        else:
+            compiled = self._all
+        return compiled is not None and compiled.match(command) is not None
+
+
+# =====================
+# POLÍTICA DE COMANDOS
+# =====================
+
+class PolicySnapshot:
+    """Política cargada y compilada; no se modifica una vez publicada"""
+
+    def __init__(self, allowed: Dict[str, List[str]], mtime: float = 0.0):
+        self.allowed = allowed
+        self.mtime = mtime
+        self.loaded_at = time.time()
+        # Se compila todo por adelantado: las validaciones nunca compilan
+        self.matchers: Dict[Tuple[str, ...], CommandMatcher] = {
+            groups: CommandMatcher([p for group in groups for p in allowed.get(group, [])])
+            for groups in set(ROLE_GRANTS.values())
+        }
+        # Payload de /commands/allowed por máscara de roles
+        self._allowed_by_mask: Dict[int, Dict[str, List[str]]] = {}
+
+    def matcher_for(self, role_mask: int) -> Optional[CommandMatcher]:
+        groups = _granted_groups(role_mask)
+        return self.matchers[groups] if groups else None
+
+    def allowed_for(self, role_mask: int) -> Dict[str, List[str]]:
+        payload = self._allowed_by_mask.get(role_mask)
+        if payload is None:
+            payload = {group: self.allowed.get(group, []) for group in _granted_groups(role_mask)}
+            self._allowed_by_mask[role_mask] = payload
+        return payload
+
+
+def _load_policy(path: Path) -> PolicySnapshot:
+    """Lee y compila el fichero de política; lanza ValueError si no es válido"""
+    mtime = path.stat().st_mtime
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    if not isinstance(data, dict):
+        raise ValueError("La política debe ser un objeto {grupo: [patrones]}")
+    for group, patterns in data.items():
+        if not isinstance(patterns, list) or not all(isinstance(p, str) for p in patterns):
+            raise ValueError(f"El grupo {group!r} debe ser una lista de patrones")
+        for pattern in patterns:
+            _check_pattern(group, pattern)
+    try:
+        # Las alternancias por verbo combinan patrones: pueden fallar aunque
+        # cada uno compile por separado (p. ej. grupos con nombre repetidos)
+        return PolicySnapshot(data, mtime)
+    except re.error as e:
+        raise ValueError(f"No se pudo compilar la política: {e}")
+
+
+# Escapes (se consumen por pares) y referencias a grupos: \1, (?P=nombre), (?(1)...)
+_GROUP_REF_RE = re.compile(r"\\[1-9]|\\.|\(\?P=|\(\?\(", re.DOTALL)
+
+
+def _check_pattern(group: str, pattern: str) -> None:
+    """Lanza ValueError si el patrón no compila o no se puede combinar con otros"""
+    try:
+        # Igual que dentro de la alternancia: los flags globales ((?i)...)
+        # solo son válidos al principio de la expresión completa
+        re.compile(f"(?:{pattern})")
+    except re.error as e:
+        raise ValueError(f"Patrón inválido en {group!r}: {pattern!r} ({e})")
+    for m in _GROUP_REF_RE.finditer(pattern):
+        token = m.group()
+        if token.startswith("(") or token[1].isdigit():
+            # Al combinar patrones los grupos se renumeran y la referencia apuntaría a otro
+            raise ValueError(f"Patrón inválido en {group!r}: {pattern!r} (referencias a grupos no permitidas)")
+
+
+class CommandPolicy:
+    """
+    Política de comandos recargable en caliente.
+
+    El fichero se vigila por mtime (como mucho una comprobación cada
+    `check_interval` segundos, desde las propias validaciones). Al cambiar,
+    se carga y compila en un hilo aparte y el snapshot nuevo se publica con
+    una sola asignación; mientras tanto, y si el fichero nuevo no es
+    válido, se sigue validando con el último snapshot correcto.
+    """
+
+    def __init__(self, path: Path, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.last_error: Optional[str] = None
+        self._reloading = threading.Lock()
+        self._next_check = 0.0
+        try:
+            self._snapshot = _load_policy(path)
+        except (OSError, ValueError) as e:
+            # Sin política válida no se permite ningún comando
+            logger.error("No se pudo cargar la política de comandos %s: %s", path, e)
+            self.last_error = str(e)
+            self._snapshot = PolicySnapshot({})
+        self._seen_mtime = self._snapshot.mtime
+
+    def current(self) -> PolicySnapshot:
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            self._check()
+        return self._snapshot
+
+    def _check(self) -> None:
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return
+        if mtime != self._seen_mtime and self._reloading.acquire(blocking=False):
+            # Un fichero roto no se reintenta hasta que vuelva a cambiar
+            self._seen_mtime = mtime
+            threading.Thread(target=self._reload, name="command-policy-reload", daemon=True).start()
+
+    def _reload(self) -> None:
+        try:
+            self._snapshot = _load_policy(self.path)
+            self.last_error = None
+            logger.info("Política de comandos recargada desde %s", self.path)
+        except (OSError, ValueError) as e:
+            logger.error("Política de comandos no válida, se mantiene la anterior: %s", e)
+            self.last_error = str(e)
+        finally:
+            self._reloading.release()
+
+    def status(self) -> Dict:
+        snapshot = self._snapshot
+        return {
+            "path": str(self.path),
+            "mtime": snapshot.mtime,
+            "loaded_at": snapshot.loaded_at,
+            "groups": {group: len(patterns) for group, patterns in snapshot.allowed.items()},
+            "last_error": self.last_error,
+        }
+
+
+def _policy_path() -> Path:
+    if not settings.COMMAND_POLICY_FILE:
+        return DEFAULT_POLICY_FILE
+    path = Path(settings.COMMAND_POLICY_FILE)
+    return path if path.is_absolute() else BASE_DIR / path
+
+
+command_policy = CommandPolicy(_policy_path(), settings.COMMAND_POLICY_CHECK_INTERVAL)
+
+# =====================
+# VALIDACIÓN
+# =====================
+
+@lru_cache(maxsize=None)
+def _granted_groups(role_mask: int) -> Tuple[str, ...]:
+    """Grupos de la política que concede una máscara de roles"""
+    for bit, groups in ROLE_GRANTS.items():
+        if role_mask & bit:
+            return groups
+    return ()
+
+
+def get_matcher(role_mask: int) -> Optional[CommandMatcher]:
+    """Matcher compilado de la política vigente, o None si no puede ejecutar comandos"""
+    return command_policy.current().matcher_for(role_mask)
+
+
+def validate_command(command: str, role_mask: int) -> bool:
     """
     Valida si un comando está permitido para los roles del usuario
     
     Args:
         command: Comando a validar
-        user_roles: Roles del usuario separados por coma (ej: "admin,operator")
+        role_mask: Máscara de roles del usuario (TokenData.role_mask)
         
     Returns:
         True si el comando está permitido, False si no
     """
-    
-    roles_list = [r.strip() for r in user_roles.split(",")]
-    
-    # Admin puede ejecutar todo
-    if "admin" in roles_list:
-        patterns = ALLOWED_COMMANDS["operator"] + ALLOWED_COMMANDS["admin"]
-    elif "operator" in roles_list:
-        patterns = ALLOWED_COMMANDS["operator"]
-    else:
-        # viewer no puede ejecutar comandos
+    matcher = get_matcher(role_mask)
+    if matcher is None:
         return False
-    
-    command_clean = command.strip()
-    
-    for pattern in patterns:
-        if re.match(pattern, command_clean, re.IGNORECASE):
-            return True
-    
-    return False
+    return matcher.match(command.strip())
 
 
-def get_allowed_commands(user_roles: str) -> Dict[str, List[str]]:
+def get_allowed_commands(role_mask: int) -> Dict[str, List[str]]:
     """
     Retorna lista de comandos permitidos para el usuario
     
     Args:
-        user_roles: Roles del usuario separados por coma
+        role_mask: Máscara de roles del usuario (TokenData.role_mask)
         
     Returns:
         Diccionario con comandos permitidos por categoría
     """
-    roles_list = [r.strip() for r in user_roles.split(",")]
-    
-    if "admin" in roles_list:
-        return {
-            "operator": ALLOWED_COMMANDS["operator"],
-            "admin": ALLOWED_COMMANDS["admin"]
-        }
-    elif "operator" in roles_list:
-        return {
-            "operator": ALLOWED_COMMANDS["operator"]
-        }
-    
-    return {}
+    return command_policy.current().allowed_for(role_mask)
 
 
 def get_command_examples() -> Dict[str, List[str]]:
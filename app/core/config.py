@@ -13,18 +13,80 @@ class Settings(BaseSettings):
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 60
+    AUTH_CACHE_TTL: float = 30.0  # segundos que se reutiliza un usuario ya resuelto
+    AUTH_CACHE_SIZE: int = 1024
+    TOKEN_CACHE_SIZE: int = 4096  # tokens decodificados guardados hasta su exp
+    TOKEN_NEGATIVE_CACHE_TTL: float = 60.0  # segundos que se recuerda un token rechazado
+    # "db": roles leídos de la BD (con caché); "stateless": se confía en los claims del token
+    AUTH_MODE: str = "db"
+    AUTH_REVOCATION_REFRESH: float = 5.0  # segundos entre lecturas de token_revocations
+    HASH_WORKERS: int = 2  # procesos dedicados a hash/verificación de contraseñas
+    HASH_TARGET_MS: float = 100.0  # tiempo objetivo de una verificación al calibrar
+    HASH_ROUNDS: int = 0  # 0 = calibrar al arrancar (ver python -m app.core.hashing)
     
     # RCON
     RCON_HOST: str = "127.0.0.1"
     RCON_PORT: int = 25575
     RCON_PASSWORD: str
+    RCON_TIMEOUT: float = 5.0
+    RCON_POOL_SIZE: int = 4
+    RCON_POOL_IDLE_TIMEOUT: float = 300.0  # segundos sin uso antes de cerrar
+    RCON_POOL_HEALTHCHECK_INTERVAL: float = 30.0  # ping antes de reutilizar una conexión parada
+    RCON_MAX_IN_FLIGHT: int = 4  # comandos simultáneos contra el servidor (como mucho RCON_POOL_SIZE)
+    RCON_BREAKER_FAILURE_THRESHOLD: int = 3
+    RCON_BREAKER_BASE_BACKOFF: float = 1.0
+    RCON_BREAKER_MAX_BACKOFF: float = 60.0
+    PLAYER_LIST_CACHE_TTL: float = 1.0
+    PLAYER_LIST_STALE_TTL: float = 10.0  # se sirve el valor antiguo mientras se recarga
+    
+    # Rate limiting de comandos RCON (tokens por segundo / ráfaga)
+    RATE_LIMIT_OPERATOR_PER_SECOND: float = 1.0
+    RATE_LIMIT_OPERATOR_BURST: int = 10
+    RATE_LIMIT_ADMIN_PER_SECOND: float = 5.0
+    RATE_LIMIT_ADMIN_BURST: int = 30
+    RATE_LIMIT_GLOBAL_PER_SECOND: float = 20.0
+    RATE_LIMIT_GLOBAL_BURST: int = 60
+    
+    # Intentos de login fallidos permitidos por ventana deslizante
+    LOGIN_MAX_FAILURES_PER_USER: int = 5
+    LOGIN_MAX_FAILURES_PER_IP: int = 20
+    LOGIN_FAILURE_WINDOW: float = 300.0  # segundos
+    
+    # Registro de auditoría (escritura diferida en lotes)
+    AUDIT_QUEUE_SIZE: int = 10000  # registros pendientes como máximo en memoria
+    AUDIT_BATCH_SIZE: int = 200  # registros por transacción
+    AUDIT_FLUSH_INTERVAL_MS: int = 500  # espera máxima antes de escribir un lote
+    AUDIT_ENQUEUE_TIMEOUT: float = 0.05  # segundos que espera una petición con la cola llena
+    AUDIT_RESULT_MAX_CHARS: int = 1000  # respuesta RCON/systemd guardada (truncada)
+    
+    # Política de comandos RCON (vacío = app/core/command_policy.json)
+    COMMAND_POLICY_FILE: str = ""
+    COMMAND_POLICY_CHECK_INTERVAL: float = 1.0  # segundos entre comprobaciones del mtime
     
     # Services
     MINECRAFT_SERVICE: str = "minecraft"
     PLAYIT_SERVICE: str = "playit"
     
-    # Database
+    # Servidores Minecraft
+    MINECRAFT_SERVER_NAME: str = "default"  # nombre del servidor principal (RCON_* + MINECRAFT_SERVICE)
+    # Servidores adicionales como lista JSON de objetos:
+    # [{"name": "survival", "host": "127.0.0.1", "port": 25576, "password": "...", "service": "mc-survival"}]
+    MINECRAFT_SERVERS: str = '[]'
+    # Segundos máximos por servidor en operaciones de flota; nunca menos que
+    # RCON_TIMEOUT, para que un comando lento expire solo y no se cancele ya escrito
+    FLEET_TIMEOUT: float = 6.0
+    
+    # Database (una ruta SQLite relativa se resuelve desde la raíz del proyecto;
+    # postgresql://... requiere psycopg2 y asyncpg instalados)
     DATABASE_URL: str = "sqlite:///./data/admin.db"
+    DB_POOL_SIZE: int = 5  # conexiones por worker de uvicorn
+    DB_MAX_OVERFLOW: int = 5
+    # Perfil SQLite, aplicado con PRAGMA a cada conexión nueva
+    SQLITE_JOURNAL_MODE: str = "WAL"  # lectores y un escritor en paralelo
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # seguro con WAL; FULL = fsync en cada commit
+    SQLITE_BUSY_TIMEOUT: int = 5000  # ms esperando el bloqueo de escritura antes de fallar
+    SQLITE_CACHE_SIZE: int = -16000  # negativo = KiB de caché de páginas por conexión
+    SQLITE_MMAP_SIZE: int = 64 * 1024 * 1024  # bytes; 0 desactiva mmap
     
     # CORS (como lista de strings)
     CORS_ORIGINS: str = '["http://localhost:3000"]'
@@ -38,6 +100,16 @@ class Settings(BaseSettings):
         except:
             return ["http://localhost:3000"]
     
+    @property
+    def minecraft_servers_list(self) -> List[dict]:
+        """Convierte string JSON a lista de servidores adicionales"""
+        import json
+        try:
+            servers = json.loads(self.MINECRAFT_SERVERS)
+        except:
+            return []
+        return servers if isinstance(servers, list) else []
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,7 +1,13 @@
-from sqlalchemy import create_engine
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url, URL
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from pathlib import Path
 
+from app.core.config import settings
+
 # Obtener directorio base del proyecto
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DATA_DIR = BASE_DIR / "data"
@@ -9,13 +15,100 @@ DATA_DIR = BASE_DIR / "data"
 # Crear directorio data si no existe
 DATA_DIR.mkdir(exist_ok=True)
 
-# Database URL con path absoluto
-DATABASE_URL = f"sqlite:///{DATA_DIR}/admin.db"
+# Driver asíncrono por backend (el síncrono es el de la URL)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+# =====================
+# URLs
+# =====================
+
+def resolve_url(url: str) -> URL:
+    """URL de settings con la ruta SQLite relativa resuelta desde BASE_DIR"""
+    parsed = make_url(url)
+    database = parsed.database
+    if parsed.get_backend_name() == "sqlite" and database and database != ":memory:":
+        path = Path(database)
+        if not path.is_absolute():
+            parsed = parsed.set(database=str(BASE_DIR / path))
+    return parsed
+
+
+def async_url(url: URL) -> URL:
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Sin driver asíncrono conocido para la base de datos '{backend}'")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def is_memory(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+# =====================
+# PERFIL SQLITE
+# =====================
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """PRAGMAs del perfil configurado, en el orden en que se aplican"""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+    }
+
+
+def _install_pragmas(engine: Engine, pragmas: Dict[str, Any]) -> None:
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        # Se ejecuta una vez por conexión física, fuera de cualquier transacción
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def _engine_options(url: URL) -> Dict[str, Any]:
+    options: Dict[str, Any] = {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+    else:
+        # Servidor remoto: descarta conexiones que cerró el otro extremo
+        options["pool_pre_ping"] = True
+    return options
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+
+def make_engine(url: URL, pragmas: Optional[Dict[str, Any]] = None) -> Engine:
+    engine = create_engine(url, **_engine_options(url))
+    if url.get_backend_name() == "sqlite":
+        _install_pragmas(engine, sqlite_pragmas() if pragmas is None else pragmas)
+    return engine
+
+
+def make_async_engine(url: URL, pragmas: Optional[Dict[str, Any]] = None) -> AsyncEngine:
+    url = async_url(url)
+    engine = create_async_engine(url, **_engine_options(url))
+    if url.get_backend_name() == "sqlite":
+        _install_pragmas(engine.sync_engine, sqlite_pragmas() if pragmas is None else pragmas)
+    return engine
+
+# =====================
+# MOTORES Y SESIONES
+# =====================
+
+DATABASE_URL = resolve_url(settings.DATABASE_URL)
+
+# El motor síncrono (init_db, scripts) y el asíncrono (rutas) abren cada
+# uno su propia conexión: en memoria serían dos BDs distintas
+if is_memory(DATABASE_URL):
+    raise ValueError("DATABASE_URL no puede ser una BD SQLite en memoria; usa un fichero (sqlite:///ruta.db)")
+
+engine = make_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -23,6 +116,16 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Motor asíncrono para las rutas: las consultas no ocupan hilos del
+# threadpool. El síncrono se mantiene para scripts e init_db.
+async_engine = make_async_engine(DATABASE_URL)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
@@ -31,4 +134,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
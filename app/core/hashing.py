@@ -0,0 +1,152 @@
+"""
+Hash y verificación de contraseñas: configuración única del proyecto.
+
+- Esquema pbkdf2_sha256 con un número de rondas calibrado para que una
+  verificación tarde ~HASH_TARGET_MS en la máquina actual (Pi o x86).
+  Se calibra al arrancar si HASH_ROUNDS = 0, o se fija con la CLI:
+      python -m app.core.hashing --target-ms 100
+- Los hashes con rondas fuera de ±25 % del objetivo, o de esquemas
+  antiguos (argon2/bcrypt, si su backend está instalado), se rehacen en
+  el siguiente login correcto (verify_and_update).
+- Las rutas hashean en un ProcessPoolExecutor de tamaño fijo: en el
+  threadpool por defecto un pico de logins ocupa los hilos que usan las
+  rutas síncronas (/system/*, /hardware/*).
+
+El módulo es deliberadamente ligero (solo passlib): es lo que importan
+los procesos del pool.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+SCHEME = "pbkdf2_sha256"
+LEGACY_SCHEMES = ["argon2", "bcrypt"]
+DEFAULT_ROUNDS = 29000  # valor por defecto de passlib
+MIN_ROUNDS = 1000
+ROUNDS_TOLERANCE = 0.25
+DEFAULT_WORKERS = 2
+
+
+def _make_context(rounds: int) -> CryptContext:
+    return CryptContext(
+        schemes=[SCHEME] + LEGACY_SCHEMES,
+        deprecated=LEGACY_SCHEMES,
+        pbkdf2_sha256__default_rounds=rounds,
+        pbkdf2_sha256__min_rounds=int(rounds * (1 - ROUNDS_TOLERANCE)),
+        pbkdf2_sha256__max_rounds=int(rounds * (1 + ROUNDS_TOLERANCE)),
+    )
+
+
+pwd_context = _make_context(DEFAULT_ROUNDS)
+rounds = DEFAULT_ROUNDS
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+# =====================
+# CONFIGURACIÓN
+# =====================
+
+def configure(new_rounds: int) -> None:
+    """Fija las rondas de los hashes nuevos (y el umbral de rehash)"""
+    global pwd_context, rounds
+    rounds = max(MIN_ROUNDS, int(new_rounds))
+    pwd_context = _make_context(rounds)
+
+
+def calibrate(target_ms: float, samples: int = 3) -> int:
+    """Rondas con las que un hash/verificación tarda ~target_ms en esta máquina"""
+    probe_rounds = 10000
+    probe = _make_context(probe_rounds)
+    elapsed = min(_time_hash(probe) for _ in range(samples))
+    estimate = probe_rounds * (target_ms / 1000) / elapsed
+    # Redondeo a miles: calibraciones sucesivas dan el mismo valor con más frecuencia
+    return max(MIN_ROUNDS, int(round(estimate, -3)))
+
+
+def _time_hash(context: CryptContext) -> float:
+    started = time.perf_counter()
+    context.hash("calibration-password")
+    return time.perf_counter() - started
+
+# =====================
+# SÍNCRONO (scripts y procesos del pool)
+# =====================
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """(válida, hash nuevo si el guardado usa parámetros antiguos)"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+# =====================
+# POOL DE PROCESOS
+# =====================
+
+def start(workers: int = DEFAULT_WORKERS, new_rounds: Optional[int] = None) -> None:
+    """Crea el pool (en el arranque de la app); si ya existe no hace nada"""
+    global _executor
+    if new_rounds is not None:
+        configure(new_rounds)
+    if _executor is None:
+        # Cada proceso aplica las mismas rondas que el proceso principal
+        _executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=_mp_context(), initializer=configure, initargs=(rounds,)
+        )
+
+def _mp_context() -> multiprocessing.context.BaseContext:
+    """
+    forkserver (o spawn donde no existe): un fork del worker de uvicorn,
+    con hilos del threadpool y del event loop, puede heredar locks
+    tomados y bloquear a los hijos
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def _get_executor() -> ProcessPoolExecutor:
+    if _executor is None:
+        start()
+    return _executor
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), verify_password, plain_password, hashed_password)
+
+async def verify_and_update_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), verify_and_update, plain_password, hashed_password)
+
+# =====================
+# CLI DE CALIBRACIÓN
+# =====================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibra las rondas de pbkdf2_sha256")
+    parser.add_argument("--target-ms", type=float, default=100.0, help="tiempo objetivo por verificación")
+    args = parser.parse_args()
+
+    calibrated = calibrate(args.target_ms)
+    configure(calibrated)
+    sample = hash_password("calibration-password")
+    started = time.perf_counter()
+    verify_password("calibration-password", sample)
+    measured = (time.perf_counter() - started) * 1000
+    print(f"HASH_ROUNDS={calibrated}  # verificación medida: {measured:.1f} ms (objetivo {args.target_ms:g} ms)")
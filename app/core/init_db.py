@@ -1,5 +1,7 @@
 from app.core.database import engine, Base
-from app.models.user import User 
+from app.models.user import User
+from app.models.token_revocation import TokenRevocation
+from app.models.audit_log import AuditLog
 
 def init_db():
     Base.metadata.create_all(bind=engine)
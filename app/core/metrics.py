@@ -0,0 +1,140 @@
+"""
+Registro de métricas en memoria con exportación JSON y Prometheus.
+
+Sin dependencias externas: histogramas de buckets fijos, contadores y
+métricas calculadas al momento de leerlas (callbacks).
+"""
+import bisect
+from typing import Callable, Dict, List, Tuple
+
+# Buckets en segundos (de 1 ms a 10 s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        # Un contador por bucket más el de +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimación por el límite superior del bucket"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> Dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.sum / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": self.quantile(0.50) * 1000,
+            "p95_ms": self.quantile(0.95) * 1000,
+            "p99_ms": self.quantile(0.99) * 1000,
+        }
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._callbacks: Dict[str, Dict[Labels, Callable[[], float]]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        self._help[name] = (kind, help_text)
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        series = self._histograms.setdefault(name, {})
+        key = _labels(labels)
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(seconds)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        series = self._counters.setdefault(name, {})
+        key = _labels(labels)
+        series[key] = series.get(key, 0) + value
+
+    def register_callback(
+        self, name: str, kind: str, help_text: str, fn: Callable[[], float], **labels: str
+    ) -> None:
+        """Métrica cuyo valor se calcula al leerla (gauge o contador externo)"""
+        self.describe(name, kind, help_text)
+        self._callbacks.setdefault(name, {})[_labels(labels)] = fn
+
+    def snapshot(self) -> Dict:
+        out: Dict = {}
+        for name, series in self._histograms.items():
+            out[name] = {_format_labels(k) or "all": h.snapshot() for k, h in series.items()}
+        for name, series in self._counters.items():
+            out[name] = {_format_labels(k) or "all": v for k, v in series.items()}
+        for name, series in self._callbacks.items():
+            out[name] = {_format_labels(k) or "all": fn() for k, fn in series.items()}
+        return out
+
+    def prometheus(self) -> str:
+        """Formato de exposición de texto de Prometheus"""
+        lines: List[str] = []
+
+        def header(name: str, default_kind: str) -> None:
+            kind, help_text = self._help.get(name, (default_kind, ""))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for name, series in self._histograms.items():
+            header(name, "histogram")
+            for labels, h in series.items():
+                cumulative = 0
+                for bound, n in zip(h.buckets, h.counts):
+                    cumulative += n
+                    le = _format_labels(labels, 'le="%s"' % bound)
+                    lines.append(f"{name}_bucket{le} {cumulative}")
+                le = _format_labels(labels, 'le="+Inf"')
+                lines.append(f"{name}_bucket{le} {h.count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {h.sum}")
+                lines.append(f"{name}_count{_format_labels(labels)} {h.count}")
+
+        for name, series in self._counters.items():
+            header(name, "counter")
+            for labels, value in series.items():
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for name, series in self._callbacks.items():
+            header(name, "gauge")
+            for labels, fn in series.items():
+                lines.append(f"{name}{_format_labels(labels)} {fn()}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,33 @@
+"""
+Cursores opacos para paginación por keyset.
+
+El cursor codifica los valores de la clave de ordenación de la última
+fila devuelta (p. ej. `(created_at, id)`). La página siguiente se pide
+con `WHERE (clave) < (cursor)` sobre un índice compuesto: el coste no
+depende de la profundidad, a diferencia de OFFSET, que recorre y
+descarta todas las filas anteriores.
+"""
+import base64
+import json
+from typing import Any, Callable, List, Optional, Sequence
+
+from fastapi import HTTPException
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: Optional[str], types: Sequence[Callable[[Any], Any]]) -> Optional[List[Any]]:
+    """Valores del cursor convertidos con `types`, None si no hay; 400 si está mal formado"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError(cursor)
+        return [convert(value) for convert, value in zip(types, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor de paginación no válido")
@@ -0,0 +1,298 @@
+import logging
+import math
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Tuple
+
+from fastapi import Depends, HTTPException, Request
+
+from app.core.auth import require_roles, TokenData
+from app.core.roles import ROLE_ADMIN
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket con recarga perezosa: O(1) por petición, sin tareas de fondo"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost: float, now: float) -> float:
+        """Segundos hasta poder gastar `cost` tokens (0 si ya se puede)"""
+        self._refill(now)
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def take(self, cost: float) -> None:
+        self.tokens -= cost
+
+
+class RateLimiter:
+    """
+    Limitador de comandos RCON: un bucket por usuario (según su rol) y
+    un bucket global compartido por todos.
+
+    Solo se gastan tokens si ambos buckets los tienen, de modo que una
+    petición rechazada por el límite global no penaliza al usuario.
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]], global_limit: Tuple[float, float]):
+        # rol -> (tokens por segundo, ráfaga)
+        self.limits = limits
+        self.global_bucket = TokenBucket(*global_limit)
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    @staticmethod
+    def _role_for(user: TokenData) -> str:
+        return "admin" if user.role_mask & ROLE_ADMIN else "operator"
+
+    def _bucket_for(self, user: TokenData) -> TokenBucket:
+        role = self._role_for(user)
+        bucket = self._buckets.get(user.username)
+        rate, burst = self.limits[role]
+        if bucket is None or bucket.rate != rate:
+            # Usuario nuevo o cambio de rol: bucket con los límites del rol
+            bucket = TokenBucket(rate, burst)
+            self._buckets[user.username] = bucket
+        return bucket
+
+    def max_cost(self, user: TokenData) -> float:
+        """Mayor coste que se puede llegar a admitir de una vez (la ráfaga menor)"""
+        return min(self._bucket_for(user).capacity, self.global_bucket.capacity)
+
+    def check(self, user: TokenData, cost: float = 1) -> Tuple[str, float]:
+        """
+        Intenta consumir `cost` tokens.
+
+        Returns:
+            ("", 0) si se permite, o (ámbito, segundos de espera) si no
+        """
+        now = time.monotonic()
+        bucket = self._bucket_for(user)
+
+        wait = bucket.wait_time(cost, now)
+        if wait:
+            return "user", wait
+        wait = self.global_bucket.wait_time(cost, now)
+        if wait:
+            return "global", wait
+
+        bucket.take(cost)
+        self.global_bucket.take(cost)
+        return "", 0.0
+
+
+rate_limiter = RateLimiter(
+    limits={
+        "operator": (settings.RATE_LIMIT_OPERATOR_PER_SECOND, settings.RATE_LIMIT_OPERATOR_BURST),
+        "admin": (settings.RATE_LIMIT_ADMIN_PER_SECOND, settings.RATE_LIMIT_ADMIN_BURST),
+    },
+    global_limit=(settings.RATE_LIMIT_GLOBAL_PER_SECOND, settings.RATE_LIMIT_GLOBAL_BURST),
+)
+
+
+def enforce_rate_limit(user: TokenData, cost: float = 1) -> None:
+    """
+    Consume `cost` tokens o lanza 429.
+
+    Un coste mayor que la ráfaga (p.ej. un lote de 200 comandos) se cobra
+    como la ráfaga completa: se admite con los buckets llenos y los deja
+    vacíos, de modo que el siguiente comando espera a que se recarguen. El
+    ritmo contra el servidor ya lo marca la cola de prioridad baja del lote.
+    """
+    cost = min(cost, rate_limiter.max_cost(user))
+    scope, wait = rate_limiter.check(user, cost)
+    if scope:
+        retry_after = max(1, math.ceil(wait))
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "message": "Demasiados comandos, espera antes de reintentar",
+                "scope": scope,
+                "retry_after": retry_after
+            },
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+def rate_limited(required_roles: list[str], cost: float = 1):
+    """Como require_roles, pero además aplica el límite de comandos RCON"""
+    async def checker(user: TokenData = Depends(require_roles(required_roles))):
+        enforce_rate_limit(user, cost)
+        return user
+    return checker
+
+
+# =====================
+# LOGIN (FUERZA BRUTA)
+# =====================
+
+class SlidingWindowLimiter:
+    """
+    Ventana deslizante de eventos por clave: como mucho `limit` eventos
+    en los últimos `window` segundos.
+
+    Guarda las marcas de tiempo de cada clave en un deque de longitud
+    `limit` (nunca hace falta recordar más) y el número de claves está
+    acotado por `max_keys`, descartando la menos reciente.
+    """
+
+    def __init__(self, limit: int, window: float, max_keys: int = 10000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._events: "OrderedDict[str, Deque[float]]" = OrderedDict()
+
+    def retry_after(self, key: str, now: float) -> float:
+        """Segundos hasta que la clave vuelva a estar por debajo del límite (0 si ya lo está)"""
+        events = self._events.get(key)
+        if events is None:
+            return 0.0
+        while events and events[0] <= now - self.window:
+            events.popleft()
+        if not events:
+            del self._events[key]
+            return 0.0
+        if len(events) < self.limit:
+            return 0.0
+        return events[0] + self.window - now
+
+    def hit(self, key: str, now: float) -> None:
+        events = self._events.get(key)
+        if events is None:
+            events = self._events[key] = deque(maxlen=self.limit)
+            while len(self._events) > self.max_keys:
+                self._events.popitem(last=False)
+        else:
+            self._events.move_to_end(key)
+        events.append(now)
+
+    def undo(self, key: str, stamp: float) -> None:
+        """Retira un evento registrado con hit (si sigue en la ventana)"""
+        events = self._events.get(key)
+        if events is None:
+            return
+        try:
+            events.remove(stamp)
+        except ValueError:
+            return
+        if not events:
+            del self._events[key]
+
+    def reset(self, key: str) -> None:
+        self._events.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def memory_bytes(self) -> int:
+        """Estimación de la memoria usada (dict, claves, deques y timestamps)"""
+        total = sys.getsizeof(self._events)
+        for key, events in self._events.items():
+            total += sys.getsizeof(key) + sys.getsizeof(events) + len(events) * sys.getsizeof(0.0)
+        return total
+
+
+class LoginGuard:
+    """
+    Protección de /auth/login frente a fuerza bruta y credential stuffing.
+
+    Cuenta los intentos por usuario y por IP de origen. Una vez superado
+    el límite, los intentos se rechazan con 429 antes de consultar la BD
+    o calcular ningún hash. El intento se cuenta antes de verificar la
+    contraseña, así que los intentos concurrentes también cuentan; un
+    login correcto lo deshace y limpia el contador del usuario (no el
+    resto de intentos de la IP).
+    """
+
+    def __init__(self, per_user: int, per_ip: int, window: float, max_keys: int = 10000):
+        self.users = SlidingWindowLimiter(per_user, window, max_keys)
+        self.ips = SlidingWindowLimiter(per_ip, window, max_keys)
+        self.lockouts = 0  # intentos rechazados sin verificar
+
+    def attempt(self, username: str, ip: str) -> Tuple[str, float, float]:
+        """
+        Comprueba el límite y, si se puede intentar, cuenta ya el intento.
+
+        Sin await entre la comprobación y el registro: en el event loop es
+        atómico, de modo que N logins concurrentes no pasan todos a la vez.
+
+        Returns:
+            ("", 0, marca) si se puede intentar (marca para success), o
+            (ámbito, segundos de espera, 0)
+        """
+        now = time.monotonic()
+        for scope, limiter, key in (("ip", self.ips, ip), ("user", self.users, username)):
+            wait = limiter.retry_after(key, now)
+            if wait:
+                self.lockouts += 1
+                return scope, wait, 0.0
+        self.users.hit(username, now)
+        self.ips.hit(ip, now)
+        return "", 0.0, now
+
+    def failure(self, username: str, ip: str) -> None:
+        now = time.monotonic()
+        if self.users.retry_after(username, now) or self.ips.retry_after(ip, now):
+            logger.warning("Login bloqueado temporalmente: usuario=%r ip=%s", username, ip)
+
+    def success(self, username: str, ip: str, stamp: float) -> None:
+        """Deshace el intento contado en attempt"""
+        self.users.reset(username)
+        self.ips.undo(ip, stamp)
+
+    def stats(self) -> Dict:
+        return {
+            "lockouts": self.lockouts,
+            "tracked_users": len(self.users),
+            "tracked_ips": len(self.ips),
+            "memory_bytes": self.users.memory_bytes() + self.ips.memory_bytes(),
+        }
+
+
+login_guard = LoginGuard(
+    per_user=settings.LOGIN_MAX_FAILURES_PER_USER,
+    per_ip=settings.LOGIN_MAX_FAILURES_PER_IP,
+    window=settings.LOGIN_FAILURE_WINDOW,
+)
+metrics.register_callback(
+    "login_lockouts_total", "counter", "Logins rechazados por exceso de intentos fallidos",
+    lambda: login_guard.lockouts)
+metrics.register_callback(
+    "login_guard_memory_bytes", "gauge", "Memoria estimada del limitador de logins",
+    lambda: login_guard.stats()["memory_bytes"])
+
+
+def check_login_allowed(username: str, request: Request) -> Tuple[str, float]:
+    """
+    Lanza 429 si el usuario o la IP están bloqueados; si no, cuenta el
+    intento y devuelve (IP, marca) para login_guard.success/failure
+    """
+    ip = request.client.host if request.client else "unknown"
+    scope, wait, stamp = login_guard.attempt(username, ip)
+    if scope:
+        retry_after = max(1, math.ceil(wait))
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "message": "Demasiados intentos fallidos, espera antes de reintentar",
+                "scope": scope,
+                "retry_after": retry_after
+            },
+            headers={"Retry-After": str(retry_after)}
+        )
+    return ip, stamp
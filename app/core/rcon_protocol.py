@@ -0,0 +1,352 @@
+"""
+Implementación asíncrona del protocolo Source RCON.
+
+Cada conexión tiene como mucho un comando pendiente: el RconClient de
+Minecraft hace una sola lectura de socket por paquete y cierra la
+conexión si esa lectura no contiene exactamente un paquete, así que no
+se puede escribir nada más mientras procesa un comando. Las respuestas
+largas llegan fragmentadas en varios paquetes con el mismo ID; para
+saber cuándo ha terminado una respuesta, al llegar el primer fragmento
+se envía un paquete vacío (SERVERDATA_RESPONSE_VALUE) con el ID
+siguiente. El servidor ya ha escrito todos los fragmentos antes de leer
+el centinela, así que cuando llega su respuesta el comando está completo.
+"""
+import asyncio
+import socket
+import struct
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Tipos de paquete
+SERVERDATA_AUTH = 3
+SERVERDATA_AUTH_RESPONSE = 2
+SERVERDATA_EXECCOMMAND = 2
+SERVERDATA_RESPONSE_VALUE = 0
+
+# size, id, type (little endian)
+_HEADER = struct.Struct("<iii")
+_SIZE = struct.Struct("<i")
+_ID_TYPE = struct.Struct("<ii")
+
+# id + type + 2 bytes nulos de terminación
+_MIN_SIZE = 10
+# Límite de Minecraft para paquetes cliente -> servidor
+MAX_COMMAND_BYTES = 1446
+# Minecraft fragmenta las respuestas en payloads de 4096 bytes; cualquier
+# tamaño mucho mayor indica un flujo corrupto
+_MAX_SIZE = 65536
+
+_MAX_ID = 2**31 - 1
+
+
+class RCONProtocolError(Exception):
+    """Paquete malformado o respuesta inesperada del servidor"""
+
+
+class RCONAuthError(Exception):
+    """Contraseña RCON incorrecta"""
+
+
+class RCONNotSentError(ConnectionError):
+    """La conexión no estaba disponible: el comando no llegó a escribirse (se puede reintentar)"""
+
+
+def encode_packet(request_id: int, packet_type: int, payload: bytes = b"") -> bytearray:
+    """Serializa un paquete en un único buffer, sin concatenaciones intermedias"""
+    size = _MIN_SIZE + len(payload)
+    buf = bytearray(4 + size)
+    _HEADER.pack_into(buf, 0, size, request_id, packet_type)
+    buf[12:12 + len(payload)] = payload
+    # Los dos bytes nulos finales ya vienen a cero en el bytearray
+    return buf
+
+
+class _PendingCommand:
+    __slots__ = ("future", "chunks", "sentinel_id")
+
+    def __init__(self, future: asyncio.Future, sentinel_id: int):
+        self.future = future
+        self.chunks: List[bytes] = []
+        self.sentinel_id = sentinel_id  # 0 hasta que se envía el centinela
+
+
+class RCONClientProtocol(asyncio.Protocol):
+    """Protocolo de bajo nivel: framing y reparto de respuestas por request ID"""
+
+    def __init__(self, encoding: str = "utf-8"):
+        self.encoding = encoding
+        self.transport: Optional[asyncio.Transport] = None
+        self.closed = False
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+        self._buffer = bytearray()
+        self._next_id = 0
+        self._pending: Dict[int, _PendingCommand] = {}
+        self._sentinels: Dict[int, int] = {}
+        self._auth: Dict[int, asyncio.Future] = {}
+        self._pings: Dict[int, asyncio.Future] = {}
+
+    # ---------------------
+    # asyncio.Protocol
+    # ---------------------
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.closed = True
+        self._fail_all(
+            ConnectionError(f"Conexión RCON cerrada: {exc}" if exc else "Conexión RCON cerrada")
+        )
+
+    def _fail_all(self, error: Exception) -> None:
+        for pending in self._pending.values():
+            if not pending.future.done():
+                pending.future.set_exception(error)
+        for future in (*self._auth.values(), *self._pings.values()):
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+        self._sentinels.clear()
+        self._auth.clear()
+        self._pings.clear()
+
+    def data_received(self, data: bytes) -> None:
+        self.bytes_received += len(data)
+        buf = self._buffer
+        buf += data
+
+        offset = 0
+        available = len(buf)
+        with memoryview(buf) as view:
+            while available - offset >= 4:
+                (size,) = _SIZE.unpack_from(view, offset)
+                if size < _MIN_SIZE or size > _MAX_SIZE:
+                    # Flujo desincronizado: no hay forma segura de recuperarlo
+                    self._fail_all(RCONProtocolError(f"Tamaño de paquete inválido: {size}"))
+                    self.transport.abort()
+                    return
+                end = offset + 4 + size
+                if end > available:
+                    break
+                request_id, packet_type = _ID_TYPE.unpack_from(view, offset + 4)
+                # Solo se copia el payload, sin los nulos de terminación
+                self._dispatch(request_id, packet_type, view[offset + 12:end - 2])
+                offset = end
+
+        if offset:
+            # La vista ya se liberó, así que se puede compactar el buffer
+            del buf[:offset]
+
+    # ---------------------
+    # DISPATCH
+    # ---------------------
+
+    def _dispatch(self, request_id: int, packet_type: int, payload: memoryview) -> None:
+        if packet_type == SERVERDATA_AUTH_RESPONSE and self._auth:
+            # Un login fallido responde con id -1
+            future = self._auth.pop(request_id, None)
+            if future is None and request_id == -1:
+                _, future = self._auth.popitem()
+                if not future.done():
+                    future.set_exception(RCONAuthError("Contraseña RCON incorrecta"))
+                return
+            if future is not None and not future.done():
+                future.set_result(True)
+            return
+
+        pending = self._pending.get(request_id)
+        if pending is not None:
+            pending.chunks.append(bytes(payload))
+            if not pending.sentinel_id:
+                # El servidor ya terminó el comando: ahora sí se puede escribir
+                pending.sentinel_id = self._new_id()
+                self._sentinels[pending.sentinel_id] = request_id
+                self._write(encode_packet(pending.sentinel_id, SERVERDATA_RESPONSE_VALUE))
+            return
+
+        command_id = self._sentinels.pop(request_id, None)
+        if command_id is not None:
+            pending = self._pending.pop(command_id, None)
+            if pending is not None and not pending.future.done():
+                body = b"".join(pending.chunks)
+                pending.future.set_result(body.decode(self.encoding, errors="replace"))
+            return
+
+        future = self._pings.pop(request_id, None)
+        if future is not None and not future.done():
+            future.set_result(True)
+        # Cualquier otro paquete (p.ej. respuestas de comandos ya expirados
+        # o el paquete extra tras el centinela) se descarta
+
+    # ---------------------
+    # ENVÍO
+    # ---------------------
+
+    def _new_id(self) -> int:
+        self._next_id = self._next_id + 1 if self._next_id < _MAX_ID else 1
+        return self._next_id
+
+    def _write(self, buf: bytearray) -> None:
+        self.bytes_sent += len(buf)
+        self.transport.write(buf)
+
+    def send_login(self, password: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        request_id = self._new_id()
+        self._auth[request_id] = future
+        self._write(encode_packet(request_id, SERVERDATA_AUTH, password.encode(self.encoding)))
+        return future
+
+    def send_command(self, command: str) -> Tuple[int, asyncio.Future]:
+        payload = command.encode(self.encoding)
+        if len(payload) > MAX_COMMAND_BYTES:
+            raise ValueError(f"Comando demasiado largo ({len(payload)} bytes, máximo {MAX_COMMAND_BYTES})")
+
+        future = asyncio.get_running_loop().create_future()
+        command_id = self._new_id()
+        self._pending[command_id] = _PendingCommand(future, 0)
+        # Solo el comando: el centinela se envía al llegar el primer fragmento
+        self._write(encode_packet(command_id, SERVERDATA_EXECCOMMAND, payload))
+        return command_id, future
+
+    def send_ping(self) -> Tuple[int, asyncio.Future]:
+        """Paquete vacío: el servidor responde sin ejecutar nada ("Unknown request 0")"""
+        future = asyncio.get_running_loop().create_future()
+        ping_id = self._new_id()
+        self._pings[ping_id] = future
+        self._write(encode_packet(ping_id, SERVERDATA_RESPONSE_VALUE))
+        return ping_id, future
+
+    def forget(self, command_id: int) -> None:
+        """Olvida un comando expirado para que su respuesta tardía se descarte"""
+        pending = self._pending.pop(command_id, None)
+        if pending is not None:
+            self._sentinels.pop(pending.sentinel_id, None)
+        self._pings.pop(command_id, None)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+
+class AsyncRCONClient:
+    """Cliente RCON asíncrono: los comandos concurrentes esperan turno en la conexión"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        password: str,
+        timeout: float = 5.0,
+        encoding: str = "utf-8",
+    ):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self.encoding = encoding
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.commands_sent = 0
+        # Duración de cada fase de connect(), para instrumentación
+        self.connect_seconds = 0.0
+        self.login_seconds = 0.0
+        self._protocol: Optional[RCONClientProtocol] = None
+        # Un comando pendiente por conexión; _queued incluye los que esperan turno
+        self._turn = asyncio.Lock()
+        self._queued = 0
+
+    async def connect(self) -> None:
+        """Abre la conexión TCP y hace login"""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        transport, protocol = await asyncio.wait_for(
+            loop.create_connection(
+                lambda: RCONClientProtocol(self.encoding), self.host, self.port
+            ),
+            self.timeout,
+        )
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            # Detecta conexiones medio abiertas (host caído sin FIN)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._protocol = protocol
+        connected = time.perf_counter()
+        self.connect_seconds = connected - started
+        try:
+            await asyncio.wait_for(protocol.send_login(self.password), self.timeout)
+        except BaseException:
+            transport.close()
+            raise
+        self.login_seconds = time.perf_counter() - connected
+
+    async def run(self, command: str, timeout: Optional[float] = None) -> str:
+        """Ejecuta un comando; las llamadas concurrentes se envían de una en una"""
+        self._queued += 1
+        try:
+            async with self._turn:
+                protocol = self._available()
+                command_id, future = protocol.send_command(command)
+                self.commands_sent += 1
+                return await self._wait(protocol, command_id, future, timeout)
+        finally:
+            self._queued -= 1
+            self.last_used = time.monotonic()
+
+    async def ping(self, timeout: Optional[float] = None) -> None:
+        """Comprueba que el servidor responde; si no, la conexión queda cerrada"""
+        async with self._turn:
+            protocol = self._available()
+            ping_id, future = protocol.send_ping()
+            await self._wait(protocol, ping_id, future, timeout)
+            self.last_used = time.monotonic()
+
+    def _available(self) -> RCONClientProtocol:
+        protocol = self._protocol
+        if protocol is None or protocol.closed:
+            raise RCONNotSentError("Conexión RCON no disponible")
+        return protocol
+
+    async def _wait(
+        self, protocol: RCONClientProtocol, request_id: int, future: asyncio.Future, timeout: Optional[float]
+    ):
+        try:
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            protocol.forget(request_id)
+            # El servidor responde en orden: sin respuesta (o si quien esperaba
+            # se canceló con el comando ya escrito) la respuesta tardía
+            # llegaría con el siguiente comando en vuelo y Minecraft cerraría
+            # la conexión, así que no puede volver a usarse
+            self.close()
+            raise
+
+    @property
+    def is_alive(self) -> bool:
+        return self._protocol is not None and not self._protocol.closed
+
+    @property
+    def in_flight(self) -> int:
+        """Comandos pendientes o esperando turno en esta conexión"""
+        return self._queued
+
+    @property
+    def bytes_sent(self) -> int:
+        return self._protocol.bytes_sent if self._protocol else 0
+
+    @property
+    def bytes_received(self) -> int:
+        return self._protocol.bytes_received if self._protocol else 0
+
+    def idle_for(self) -> float:
+        return time.monotonic() - self.last_used
+
+    def close(self) -> None:
+        protocol = self._protocol
+        if protocol is not None and protocol.transport is not None:
+            # No disponible desde ya, sin esperar a connection_lost
+            protocol.closed = True
+            protocol.transport.close()
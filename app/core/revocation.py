@@ -0,0 +1,160 @@
+"""
+Lista de revocación de tokens JWT en memoria.
+
+Se alimenta de la tabla `token_revocations`: cada worker lee de forma
+incremental las filas con id mayor que la última vista, como mucho una vez
+cada AUTH_REVOCATION_REFRESH segundos. Comprobar un token es una búsqueda
+en un set y en un dict, sin tocar SQLite en cada petición. Las filas que
+ya caducaron (expires_at pasado) no revocan nada y se borran al arrancar y
+después cada PURGE_INTERVAL segundos, para que la tabla siga siendo pequeña.
+
+La misma tabla avisa a todos los workers de los cambios de un usuario
+(roles, contraseña, borrado): cada fila con username se notifica a los
+suscriptores de on_user_change, que descartan lo que tengan en caché.
+"""
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.token_revocation import TokenRevocation
+
+logger = logging.getLogger(__name__)
+
+# Vida máxima de un token: login usa 15 minutos, el resto JWT_EXPIRE_MINUTES
+TOKEN_MAX_LIFETIME = max(settings.JWT_EXPIRE_MINUTES, 15) * 60
+# Segundos entre borrados de filas caducadas
+PURGE_INTERVAL = 3600.0
+
+
+class RevocationList:
+    def __init__(self, refresh_interval: float = 5.0):
+        self.refresh_interval = refresh_interval
+        self._jtis: Dict[str, float] = {}        # jti -> expires_at
+        self._not_before: Dict[str, float] = {}  # username -> iat mínimo válido
+        self._user_expires: Dict[str, float] = {}
+        self._last_id = 0
+        self._next_refresh = 0.0
+        self._next_purge = 0.0
+        self._refreshing = False
+        self._user_listeners: List[Callable[[str], None]] = []
+
+    def on_user_change(self, callback: Callable[[str], None]) -> None:
+        """Registra una función a la que se llama con el username de cada usuario modificado"""
+        self._user_listeners.append(callback)
+
+    def needs_refresh(self) -> bool:
+        return not self._refreshing and time.monotonic() >= self._next_refresh
+
+    def is_revoked(self, username: str, jti: Optional[str], iat: Optional[float]) -> bool:
+        if jti is not None and jti in self._jtis:
+            return True
+        not_before = self._not_before.get(username)
+        return not_before is not None and (iat is None or iat <= not_before)
+
+    async def refresh(self) -> None:
+        """Lee las revocaciones nuevas; si falla se sigue con la lista actual"""
+        # Un solo refresco a la vez: el resto de peticiones no espera
+        if self._refreshing:
+            return
+        self._refreshing = True
+        self._next_refresh = time.monotonic() + self.refresh_interval
+        try:
+            async with AsyncSessionLocal() as db:
+                await self.load(db)
+                if time.monotonic() >= self._next_purge:
+                    self._next_purge = time.monotonic() + PURGE_INTERVAL
+                    await self.purge(db)
+        except Exception as e:
+            logger.warning("No se pudo refrescar la lista de revocación: %s", e)
+        finally:
+            self._refreshing = False
+
+    async def load(self, db: AsyncSession) -> int:
+        """Aplica las revocaciones nuevas; devuelve cuántas filas se leyeron"""
+        result = await db.execute(
+            select(TokenRevocation)
+            .where(TokenRevocation.id > self._last_id)
+            .order_by(TokenRevocation.id)
+        )
+        rows = result.scalars().all()
+        for row in rows:
+            self._apply(row.jti, row.username, row.not_before, row.expires_at)
+            self._last_id = row.id
+        self._prune()
+        return len(rows)
+
+    async def purge(self, db: AsyncSession) -> int:
+        """Borra las filas caducadas; devuelve cuántas se borraron"""
+        # La fila con el id más alto se conserva siempre: SQLite reutiliza el
+        # id máximo si se borra, y los workers que ya lo leyeron se saltarían
+        # la fila nueva
+        newest = select(func.max(TokenRevocation.id)).scalar_subquery()
+        result = await db.execute(
+            delete(TokenRevocation)
+            .where(TokenRevocation.expires_at < time.time())
+            .where(TokenRevocation.id < newest)
+        )
+        await db.commit()
+        if result.rowcount:
+            logger.info("Lista de revocación: %d filas caducadas borradas", result.rowcount)
+        return result.rowcount
+
+    def _apply(
+        self, jti: Optional[str], username: Optional[str], not_before: Optional[float], expires_at: float
+    ) -> None:
+        if jti is not None:
+            self._jtis[jti] = expires_at
+        if username is not None:
+            for callback in self._user_listeners:
+                callback(username)
+        if username is not None and not_before is not None:
+            if not_before > self._not_before.get(username, 0.0):
+                self._not_before[username] = not_before
+                self._user_expires[username] = expires_at
+
+    def _prune(self) -> None:
+        """Olvida las revocaciones de tokens que ya habrían caducado"""
+        now = time.time()
+        for jti in [j for j, exp in self._jtis.items() if exp < now]:
+            del self._jtis[jti]
+        for username in [u for u, exp in self._user_expires.items() if exp < now]:
+            del self._user_expires[username]
+            del self._not_before[username]
+
+    async def revoke_token(self, db: AsyncSession, jti: str, expires_at: float) -> None:
+        db.add(TokenRevocation(jti=jti, expires_at=expires_at))
+        await db.commit()
+        # Efecto inmediato en este worker; el resto lo verá al refrescar
+        self._apply(jti, None, None, expires_at)
+
+    async def revoke_user(self, db: AsyncSession, username: str) -> None:
+        """Revoca todos los tokens del usuario emitidos hasta ahora"""
+        now = time.time()
+        db.add(TokenRevocation(username=username, not_before=now, expires_at=now + TOKEN_MAX_LIFETIME))
+        await db.commit()
+        self._apply(None, username, now, now + TOKEN_MAX_LIFETIME)
+
+    async def notify_user_change(self, db: AsyncSession, username: str) -> None:
+        """
+        Avisa a todos los workers de que el usuario cambió, sin revocar sus
+        tokens (modo db: los roles se leen de la BD, solo sobra la caché)
+        """
+        now = time.time()
+        db.add(TokenRevocation(username=username, expires_at=now + settings.AUTH_CACHE_TTL))
+        await db.commit()
+        self._apply(None, username, None, now + settings.AUTH_CACHE_TTL)
+
+    def stats(self) -> Dict:
+        return {
+            "revoked_tokens": len(self._jtis),
+            "revoked_users": len(self._not_before),
+            "last_id": self._last_id,
+        }
+
+
+revocation_list = RevocationList(settings.AUTH_REVOCATION_REFRESH)
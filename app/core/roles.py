@@ -0,0 +1,45 @@
+"""
+Roles como máscara de bits.
+
+`User.roles` se guarda como texto separado por comas ("admin,operator").
+Se convierte una sola vez por petición en un entero con un bit por rol:
+comprobar un rol es un `&` y la máscara sirve de clave de caché para el
+matcher de comandos y la lista de comandos permitidos.
+"""
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List
+
+ROLE_VIEWER = 1 << 0
+ROLE_OPERATOR = 1 << 1
+ROLE_ADMIN = 1 << 2
+
+ROLE_BITS = {
+    "viewer": ROLE_VIEWER,
+    "operator": ROLE_OPERATOR,
+    "admin": ROLE_ADMIN,
+}
+
+
+@lru_cache(maxsize=256)
+def parse_roles(roles: str) -> int:
+    """"admin, operator" -> ROLE_ADMIN | ROLE_OPERATOR (los roles desconocidos se ignoran)"""
+    mask = 0
+    for role in roles.split(","):
+        mask |= ROLE_BITS.get(role.strip(), 0)
+    return mask
+
+
+def roles_mask(roles: Iterable[str]) -> int:
+    mask = 0
+    for role in roles:
+        mask |= ROLE_BITS[role]
+    return mask
+
+
+@lru_cache(maxsize=None)
+def role_names(mask: int) -> FrozenSet[str]:
+    return frozenset(name for name, bit in ROLE_BITS.items() if mask & bit)
+
+
+def sorted_role_names(mask: int) -> List[str]:
+    return [name for name, bit in ROLE_BITS.items() if mask & bit]
@@ -1,6 +1,17 @@
-from fastapi import FastAPI
-from app.routers import auth, minecraft, users, system, hardware
+import logging
+import math
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.routers import auth, minecraft, servers, users, system, hardware, audit
 from app.core.init_db import init_db
+from app.core.config import settings
+from app.core import hashing
+from app.core.revocation import revocation_list
+from app.services.server_registry import server_registry
+from app.services.audit_log import audit_log
+from app.services.circuit_breaker import RCONUnavailableError
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="MC Admin API",
@@ -14,17 +25,50 @@ app = FastAPI(
 
 app.include_router(auth.router)
 app.include_router(minecraft.router)
+app.include_router(servers.router)  # después de minecraft: /minecraft/{server}/...
 app.include_router(users.router)
 app.include_router(system.router)
 app.include_router(hardware.router)
+app.include_router(audit.router)
+
+# =========================
+# ERRORS
+# =========================
+
+@app.exception_handler(RCONUnavailableError)
+async def rcon_unavailable_handler(request: Request, exc: RCONUnavailableError):
+    retry_after = max(1, math.ceil(exc.retry_after))
+    return JSONResponse(
+        status_code=503,
+        content={
+            "detail": "Servidor Minecraft no disponible",
+            "reason": exc.reason,
+            "retry_after": retry_after
+        },
+        headers={"Retry-After": str(retry_after)}
+    )
 
 # =========================
 # STARTUP
 # =========================
 
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
     init_db()
+    # Revocaciones cargadas antes de aceptar peticiones
+    await revocation_list.refresh()
+    # HASH_ROUNDS = 0: se calibran las rondas para esta máquina
+    rounds = settings.HASH_ROUNDS or hashing.calibrate(settings.HASH_TARGET_MS)
+    hashing.start(settings.HASH_WORKERS, rounds)
+    logger.info("Hash de contraseñas: pbkdf2_sha256 con %d rondas", rounds)
+    audit_log.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    # Lo pendiente de auditoría se escribe antes de cerrar
+    await audit_log.stop()
+    server_registry.close()
+    hashing.shutdown()
 
 # =========================
 # HEALTHCHECK
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Float, Index, Integer, String
+from app.core.database import Base
+
+class AuditLog(Base):
+    """
+    Acciones ejecutadas desde el panel: comandos RCON, moderación y systemd.
+
+    - action: "rcon" o "systemd"; verb: primera palabra del comando
+      (kick, ban, say...) o acción systemd (start, stop, restart)
+    - outcome: "success", "error" o "denied" (rechazado por la política)
+    - created_at: epoch en segundos, instante en que terminó la acción
+
+    Los índices compuestos terminan en (created_at, id) para filtrar por
+    usuario, verbo o resultado y recorrer por orden temporal.
+    """
+    __tablename__ = "audit_log"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(Float, nullable=False)
+    username = Column(String, nullable=False)
+    action = Column(String, nullable=False)
+    verb = Column(String, nullable=False)
+    server = Column(String, nullable=True)
+    target = Column(String, nullable=True)
+    command = Column(String, nullable=True)
+    outcome = Column(String, nullable=False)
+    result = Column(String, nullable=True)
+    latency_ms = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_audit_log_time", "created_at", "id"),
+        Index("ix_audit_log_user_time", "username", "created_at", "id"),
+        Index("ix_audit_log_verb_time", "verb", "created_at", "id"),
+        Index("ix_audit_log_outcome_time", "outcome", "created_at", "id"),
+    )
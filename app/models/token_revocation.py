@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Float, Integer, String
+from app.core.database import Base
+
+class TokenRevocation(Base):
+    """
+    Revocaciones de tokens JWT. Las filas solo se añaden; se borran una vez
+    pasado su `expires_at` (ver RevocationList.purge).
+
+    - jti: revoca un token concreto (logout) hasta su `expires_at`
+    - username + not_before: revoca todos los tokens del usuario emitidos
+      antes de ese instante (cambio de roles/contraseña o borrado)
+    - username sin not_before: el usuario cambió (modo db); cada worker
+      descarta sus datos en caché al leer la fila, sin revocar tokens
+    """
+    __tablename__ = "token_revocations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String, index=True, nullable=True)
+    username = Column(String, index=True, nullable=True)
+    not_before = Column(Float, nullable=True)
+    expires_at = Column(Float, nullable=False)
@@ -0,0 +1,164 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row, Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import require_roles, TokenData
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.audit_log import AuditLog
+from app.schemas.audit import AuditPage
+
+router = APIRouter(
+    prefix="/audit",
+    tags=["Audit"]
+)
+
+EXPORT_FIELDS = (
+    "id", "created_at", "username", "action", "verb", "server",
+    "target", "command", "outcome", "result", "latency_ms",
+)
+EXPORT_COLUMNS = [getattr(AuditLog, field) for field in EXPORT_FIELDS]
+EXPORT_CHUNK = 1000  # filas por consulta durante la exportación
+
+Outcome = Literal["success", "error", "denied"]
+
+# =====================
+# CONSULTAS POR KEYSET
+# =====================
+
+class AuditFilters:
+    """Filtros comunes de /audit y /audit/export (parámetros de query)"""
+
+    def __init__(
+        self,
+        username: Optional[str] = Query(None, description="Usuario que ejecutó la acción"),
+        verb: Optional[str] = Query(None, description="Primera palabra del comando o acción systemd"),
+        outcome: Optional[Outcome] = Query(None),
+        since: Optional[datetime] = Query(None, description="Desde (ISO 8601 o epoch, incluido)"),
+        until: Optional[datetime] = Query(None, description="Hasta (ISO 8601 o epoch, excluido)"),
+    ):
+        self.clauses = []
+        if username:
+            self.clauses.append(AuditLog.username == username)
+        if verb:
+            self.clauses.append(AuditLog.verb == verb.lower())
+        if outcome:
+            self.clauses.append(AuditLog.outcome == outcome)
+        if since:
+            self.clauses.append(AuditLog.created_at >= since.timestamp())
+        if until:
+            self.clauses.append(AuditLog.created_at < until.timestamp())
+
+
+def _page_query(
+    filters: AuditFilters, after: Optional[List], limit: int, newest_first: bool, columns: Optional[List] = None
+) -> Select:
+    """
+    Una página ordenada por (created_at, id), siguiendo a la fila `after`.
+
+    Con un filtro de igualdad (usuario, verbo o resultado), SQLite
+    recorre el índice compuesto correspondiente desde la posición del
+    cursor; sin filtros, ix_audit_log_time. Nunca se usa OFFSET.
+    """
+    key = tuple_(AuditLog.created_at, AuditLog.id)
+    query = select(*columns) if columns else select(AuditLog)
+    query = query.where(*filters.clauses)
+    if after is not None:
+        bound = tuple_(*after)
+        query = query.where(key < bound if newest_first else key > bound)
+    if newest_first:
+        query = query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+    else:
+        query = query.order_by(AuditLog.created_at, AuditLog.id)
+    return query.limit(limit)
+
+# =====================
+# LISTADO (ADMIN)
+# =====================
+
+@router.get("", response_model=AuditPage)
+async def list_audit_log(
+    filters: AuditFilters = Depends(),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    db: AsyncSession = Depends(get_async_db),
+    _: TokenData = Depends(require_roles(["admin"]))
+):
+    """Registro de auditoría, de más reciente a más antiguo"""
+    after = decode_cursor(cursor, (float, int))
+    # Se pide una fila de más para saber si hay página siguiente
+    result = await db.execute(_page_query(filters, after, limit + 1, newest_first=True))
+    rows = result.scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return {"items": rows, "next_cursor": next_cursor}
+
+# =====================
+# EXPORTACIÓN (ADMIN)
+# =====================
+
+async def _export_rows(filters: AuditFilters) -> AsyncIterator[List[Row]]:
+    """Bloques de EXPORT_CHUNK tuplas (EXPORT_FIELDS) en orden cronológico, sin objetos ORM"""
+    after = None
+    while True:
+        # Una sesión corta por bloque: sin transacciones de lectura largas
+        # que impidan a SQLite hacer checkpoint del WAL durante la descarga
+        async with AsyncSessionLocal() as db:
+            query = _page_query(filters, after, EXPORT_CHUNK, newest_first=False, columns=EXPORT_COLUMNS)
+            rows = (await db.execute(query)).all()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < EXPORT_CHUNK:
+            return
+        after = [rows[-1].created_at, rows[-1].id]
+
+
+async def _ndjson(filters: AuditFilters) -> AsyncIterator[str]:
+    async for rows in _export_rows(filters):
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+
+async def _csv(filters: AuditFilters) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    async for rows in _export_rows(filters):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Solo cabecera si no hay filas
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@router.get("/export")
+async def export_audit_log(
+    filters: AuditFilters = Depends(),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    _: TokenData = Depends(require_roles(["admin"]))
+):
+    """Exporta el registro filtrado en streaming (memoria constante)"""
+    if format == "csv":
+        body, media_type = _csv(filters), "text/csv"
+    else:
+        body, media_type = _ndjson(filters), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="audit.{format}"'}
+    )
@@ -1,9 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
-from app.core.database import get_db
-from app.core.auth import authenticate_user, create_access_token
+from app.core.database import get_async_db
+from app.core.auth import (
+    authenticate_user_async,
+    create_access_token,
+    get_current_user,
+    principal_cache,
+    rejected_tokens,
+    require_roles,
+    token_cache,
+    TokenData
+)
+from app.core.revocation import revocation_list
+from app.core.rate_limit import check_login_allowed, login_guard
 
 # Esquema para aceptar JSON
 class LoginRequest(BaseModel):
@@ -16,18 +27,24 @@ router = APIRouter(
 )
 
 @router.post("/login")
-def login(
+async def login(
     login_data: LoginRequest, # Cambiado de OAuth2PasswordRequestForm a nuestro esquema JSON
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
+    # Antes de tocar la BD o calcular ningún hash; el intento ya cuenta
+    ip, stamp = check_login_allowed(login_data.username, request)
+
     # Usamos login_data.username y login_data.password
-    user = authenticate_user(db, login_data.username, login_data.password)
+    user = await authenticate_user_async(db, login_data.username, login_data.password)
 
     if not user:
+        login_guard.failure(login_data.username, ip)
         raise HTTPException(
             status_code=401,
             detail="Usuario o contraseña incorrectos"
         )
+    login_guard.success(login_data.username, ip, stamp)
 
     access_token = create_access_token(
         data={
@@ -39,4 +56,31 @@ def login(
     return {
         "access_token": access_token,
         "token_type": "bearer"
-    }
\ No newline at end of file
+    }
+
+@router.post("/logout")
+async def logout(
+    user: TokenData = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Revoca el token usado en la petición"""
+    if user.jti is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Token sin jti: no se puede revocar individualmente"
+        )
+    await revocation_list.revoke_token(db, user.jti, user.exp)
+    return {"success": True}
+
+@router.get("/stats")
+def auth_stats(
+    _: TokenData = Depends(require_roles(["admin"]))
+):
+    """Caché de usuarios, revocaciones y bloqueos de login"""
+    return {
+        "principal_cache": principal_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "rejected_tokens": rejected_tokens.stats(),
+        "revocations": revocation_list.stats(),
+        "login_guard": login_guard.stats()
+    }
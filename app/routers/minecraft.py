@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
 from app.core.auth import require_roles, TokenData
+from app.core.roles import sorted_role_names
+from app.core.rate_limit import rate_limited
+from app.core.metrics import metrics
+from app.schemas.minecraft import CommandRequest, MessageRequest, BatchCommandRequest
+from app.services import rcon_actions
 from app.services.rcon_service import rcon_service
 from app.core.command_validator import (
-    validate_command, 
     get_allowed_commands,
-    get_command_examples
+    get_command_examples,
+    command_policy
 )
 
 router = APIRouter(
@@ -13,16 +18,6 @@ router = APIRouter(
     tags=["Minecraft"]
 )
 
-# =====================
-# SCHEMAS
-# =====================
-
-class CommandRequest(BaseModel):
-    command: str
-
-class MessageRequest(BaseModel):
-    message: str
-
 # =====================
 # STATUS & PLAYERS
 # =====================
@@ -35,14 +30,10 @@ async def get_players():
 @router.post("/op/{player}")
 async def make_op(
     player: str,
-    _: TokenData = Depends(require_roles(["admin"]))
+    user: TokenData = Depends(rate_limited(["admin"]))
 ):
-    try:
-        response = await rcon_service.make_op(player)
-        return {"success": True, "player": player, "response": response}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    
+    return await rcon_actions.make_op(rcon_service, player, user)
+
 # =====================
 # GENERIC COMMAND
 # =====================
@@ -50,28 +41,59 @@ async def make_op(
 @router.post("/command")
 async def run_command(
     data: CommandRequest,
-    user: TokenData = Depends(require_roles(["admin", "operator"]))
+    user: TokenData = Depends(rate_limited(["admin", "operator"]))
 ):
     """Ejecuta un comando RCON genérico (validado)"""
-    
-    # Validar comando según el rol del usuario
-    if not validate_command(data.command, user.roles):
-        raise HTTPException(
-            status_code=403,
-            detail=f"Comando no permitido para tu rol: {data.command}"
-        )
-    
-    try:
-        # Usamos await porque la comunicación de red es asíncrona
-        result = await rcon_service.execute(data.command)
-        return {
-            "success": True,
-            "command": data.command,
-            "executed_by": user.username,
-            "response": result
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await rcon_actions.run_command(rcon_service, data.command, user)
+
+# =====================
+# BATCH COMMANDS
+# =====================
+
+@router.post("/commands/batch")
+async def run_command_batch(
+    data: BatchCommandRequest,
+    user: TokenData = Depends(require_roles(["admin", "operator"]))
+):
+    """Ejecuta una lista de comandos RCON (validados), en orden salvo con parallel"""
+    return await rcon_actions.run_batch(rcon_service, data.commands, data.parallel, user)
+
+# =====================
+# DISPATCH QUEUE
+# =====================
+
+@router.get("/queue")
+def get_queue_stats(
+    _: TokenData = Depends(require_roles(["admin"]))
+):
+    """Profundidad de la cola RCON y tiempos de espera por prioridad"""
+    return rcon_service.scheduler.stats()
+
+# =====================
+# METRICS
+# =====================
+
+@router.get("/metrics")
+def get_rcon_metrics(
+    _: TokenData = Depends(require_roles(["admin"]))
+):
+    """Latencias, errores y uso de conexiones RCON"""
+    return {
+        "metrics": metrics.snapshot(),
+        "pool": rcon_service.pool.stats(),
+        "queue": rcon_service.scheduler.stats(),
+        "breaker": rcon_service.breaker.snapshot()
+    }
+
+@router.get("/metrics/prometheus", response_class=PlainTextResponse)
+def get_rcon_metrics_prometheus(
+    _: TokenData = Depends(require_roles(["admin"]))
+):
+    """Las mismas métricas en formato de texto de Prometheus"""
+    return PlainTextResponse(
+        metrics.prometheus(),
+        media_type="text/plain; version=0.0.4"
+    )
 
 # =====================
 # ALLOWED COMMANDS
@@ -82,15 +104,22 @@ def get_user_allowed_commands(
     user: TokenData = Depends(require_roles(["admin", "operator"]))
 ):
     """Retorna comandos permitidos (Síncrono ya que no requiere RCON)"""
-    allowed = get_allowed_commands(user.roles)
+    allowed = get_allowed_commands(user.role_mask)
     examples = get_command_examples()
     
     return {
         "allowed_patterns": allowed,
         "examples": examples,
-        "user_roles": user.roles
+        "user_roles": sorted_role_names(user.role_mask)
     }
 
+@router.get("/commands/policy")
+def get_command_policy_status(
+    _: TokenData = Depends(require_roles(["admin"]))
+):
+    """Fichero de política vigente, fecha de carga y último error de recarga"""
+    return command_policy.status()
+
 # =====================
 # BROADCAST MESSAGE
 # =====================
@@ -98,19 +127,10 @@ def get_user_allowed_commands(
 @router.post("/message")
 async def send_broadcast_message(
     data: MessageRequest,
-    user: TokenData = Depends(require_roles(["admin", "operator"]))
+    user: TokenData = Depends(rate_limited(["admin", "operator"]))
 ):
     """Envía mensaje broadcast a todos los jugadores"""
-    try:
-        response = await rcon_service.send_message(data.message)
-        return {
-            "success": True,
-            "message": data.message,
-            "sent_by": user.username,
-            "response": response
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await rcon_actions.send_message(rcon_service, data.message, user)
 
 # =====================
 # WHITELIST
@@ -121,22 +141,14 @@ async def whitelist_add(
     player: str,
     _: TokenData = Depends(require_roles(["admin", "operator"]))
 ):
-    try:
-        response = await rcon_service.whitelist_add(player)
-        return {"success": True, "player": player, "response": response}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await rcon_actions.whitelist_add(rcon_service, player)
 
 @router.post("/whitelist/remove/{player}")
 async def whitelist_remove(
     player: str,
     _: TokenData = Depends(require_roles(["admin"]))
 ):
-    try:
-        response = await rcon_service.whitelist_remove(player)
-        return {"success": True, "player": player, "response": response}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await rcon_actions.whitelist_remove(rcon_service, player)
 
 # =====================
 # KICK
@@ -146,13 +158,9 @@ async def whitelist_remove(
 async def kick_player(
     player: str,
     reason: str = "Expulsado por el administrador",
-    _: TokenData = Depends(require_roles(["admin", "operator"]))
+    user: TokenData = Depends(rate_limited(["admin", "operator"]))
 ):
-    try:
-        response = await rcon_service.kick_player(player, reason)
-        return {"success": True, "player": player, "reason": reason, "response": response}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await rcon_actions.kick_player(rcon_service, player, reason, user)
 
 # =====================
 # BAN
@@ -162,21 +170,13 @@ async def kick_player(
 async def ban_player(
     player: str,
     reason: str = "Baneado por el administrador",
-    _: TokenData = Depends(require_roles(["admin"]))
+    user: TokenData = Depends(rate_limited(["admin"]))
 ):
-    try:
-        response = await rcon_service.ban_player(player, reason)
-        return {"success": True, "player": player, "reason": reason, "response": response}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await rcon_actions.ban_player(rcon_service, player, reason, user)
 
 @router.post("/pardon/{player}")
 async def pardon_player(
     player: str,
-    _: TokenData = Depends(require_roles(["admin"]))
+    user: TokenData = Depends(rate_limited(["admin"]))
 ):
-    try:
-        response = await rcon_service.pardon_player(player)
-        return {"success": True, "player": player, "response": response}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+    return await rcon_actions.pardon_player(rcon_service, player, user)
@@ -0,0 +1,224 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.core.auth import require_roles, TokenData
+from app.core.rate_limit import rate_limited
+from app.schemas.minecraft import CommandRequest, MessageRequest, BatchCommandRequest
+from app.services import rcon_actions
+from app.services.rcon_service import RCONService
+from app.services.server_registry import server_registry
+from app.services.systemd_service import systemd_service
+from app.services.audit_log import audit_log
+
+# Rutas por servidor (/minecraft/{server}/...) y de flota. Se registran
+# después del router de minecraft para que sus rutas fijas tengan prioridad.
+router = APIRouter(
+    prefix="/minecraft",
+    tags=["Servers"]
+)
+
+
+def get_server(server: str) -> RCONService:
+    service = server_registry.get(server)
+    if service is None:
+        raise HTTPException(status_code=404, detail=f"Servidor no encontrado: {server}")
+    return service
+
+# =====================
+# REGISTRY
+# =====================
+
+@router.get("/servers")
+def list_servers(
+    _: TokenData = Depends(require_roles(["admin", "operator", "viewer"]))
+):
+    """Servidores registrados con su unidad systemd y estado del circuito"""
+    return {"servers": server_registry.describe()}
+
+# =====================
+# FLEET
+# =====================
+
+@router.get("/fleet/players")
+async def get_fleet_players():
+    """Jugadores conectados en todos los servidores (consulta en paralelo)"""
+    results = await server_registry.fan_out(lambda s: s.get_player_list())
+
+    servers = {}
+    for name, outcome in results.items():
+        players = outcome.get("result") or {}
+        if outcome["ok"] and "error" in players:
+            outcome = {"ok": False, "error": players["error"], "elapsed_ms": outcome["elapsed_ms"]}
+        servers[name] = outcome
+
+    return {
+        "online": sum(o["result"]["online"] for o in servers.values() if o["ok"]),
+        "reachable": sum(1 for o in servers.values() if o["ok"]),
+        "total_servers": len(servers),
+        "servers": servers
+    }
+
+@router.post("/fleet/broadcast")
+async def fleet_broadcast(
+    data: MessageRequest,
+    user: TokenData = Depends(rate_limited(["admin", "operator"]))
+):
+    """Envía un mensaje a todos los servidores a la vez"""
+    results = await server_registry.fan_out(lambda s: s.send_message(data.message))
+    for outcome in results.values():
+        # execute() devuelve los errores RCON como texto
+        if outcome["ok"] and str(outcome["result"]).startswith("Error:"):
+            outcome.update(ok=False, error=outcome.pop("result"))
+
+    return {
+        "success": all(o["ok"] for o in results.values()),
+        "message": data.message,
+        "sent_by": user.username,
+        "servers": results
+    }
+
+# =====================
+# PER-SERVER PLAYERS
+# =====================
+
+@router.get("/{server}/players")
+async def get_server_players(service: RCONService = Depends(get_server)):
+    """Jugadores conectados en un servidor concreto"""
+    return await service.get_player_list()
+
+# =====================
+# PER-SERVER COMMANDS
+# =====================
+
+@router.post("/{server}/command")
+async def run_server_command(
+    data: CommandRequest,
+    service: RCONService = Depends(get_server),
+    user: TokenData = Depends(rate_limited(["admin", "operator"]))
+):
+    """Ejecuta un comando RCON genérico (validado) en un servidor"""
+    return await rcon_actions.run_command(service, data.command, user)
+
+@router.post("/{server}/commands/batch")
+async def run_server_command_batch(
+    data: BatchCommandRequest,
+    service: RCONService = Depends(get_server),
+    user: TokenData = Depends(require_roles(["admin", "operator"]))
+):
+    """Ejecuta una lista de comandos RCON (validados) en un servidor"""
+    return await rcon_actions.run_batch(service, data.commands, data.parallel, user)
+
+@router.post("/{server}/message")
+async def send_server_message(
+    data: MessageRequest,
+    service: RCONService = Depends(get_server),
+    user: TokenData = Depends(rate_limited(["admin", "operator"]))
+):
+    """Envía mensaje broadcast a los jugadores de un servidor"""
+    return await rcon_actions.send_message(service, data.message, user)
+
+# =====================
+# PER-SERVER MODERATION
+# =====================
+
+@router.post("/{server}/whitelist/add/{player}")
+async def server_whitelist_add(
+    player: str,
+    service: RCONService = Depends(get_server),
+    _: TokenData = Depends(require_roles(["admin", "operator"]))
+):
+    return await rcon_actions.whitelist_add(service, player)
+
+@router.post("/{server}/whitelist/remove/{player}")
+async def server_whitelist_remove(
+    player: str,
+    service: RCONService = Depends(get_server),
+    _: TokenData = Depends(require_roles(["admin"]))
+):
+    return await rcon_actions.whitelist_remove(service, player)
+
+@router.post("/{server}/kick/{player}")
+async def server_kick_player(
+    player: str,
+    reason: str = "Expulsado por el administrador",
+    service: RCONService = Depends(get_server),
+    user: TokenData = Depends(rate_limited(["admin", "operator"]))
+):
+    return await rcon_actions.kick_player(service, player, reason, user)
+
+@router.post("/{server}/ban/{player}")
+async def server_ban_player(
+    player: str,
+    reason: str = "Baneado por el administrador",
+    service: RCONService = Depends(get_server),
+    user: TokenData = Depends(rate_limited(["admin"]))
+):
+    return await rcon_actions.ban_player(service, player, reason, user)
+
+@router.post("/{server}/pardon/{player}")
+async def server_pardon_player(
+    player: str,
+    service: RCONService = Depends(get_server),
+    user: TokenData = Depends(rate_limited(["admin"]))
+):
+    return await rcon_actions.pardon_player(service, player, user)
+
+@router.post("/{server}/op/{player}")
+async def server_make_op(
+    player: str,
+    service: RCONService = Depends(get_server),
+    user: TokenData = Depends(rate_limited(["admin"]))
+):
+    return await rcon_actions.make_op(service, player, user)
+
+# =====================
+# PER-SERVER SYSTEMD UNIT
+# =====================
+
+@router.get("/{server}/service/status")
+def server_service_status(
+    service: RCONService = Depends(get_server),
+    _: TokenData = Depends(require_roles(["admin", "operator", "viewer"]))
+):
+    """Estado de la unidad systemd del servidor"""
+    try:
+        status = systemd_service.status(service.unit)
+        if status["state"] in ("inactive", "failed"):
+            service.mark_service_down()
+        return {"server": service.name, **status}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/{server}/service/start")
+def server_service_start(
+    service: RCONService = Depends(get_server),
+    user: TokenData = Depends(require_roles(["admin", "operator"]))
+):
+    with audit_log.track(user.username, "systemd", "start", service.name, service.unit):
+        try:
+            return {"server": service.name, **systemd_service.start(service.unit)}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/{server}/service/stop")
+def server_service_stop(
+    service: RCONService = Depends(get_server),
+    user: TokenData = Depends(require_roles(["admin"]))
+):
+    """Detiene la unidad systemd del servidor (solo admin)"""
+    with audit_log.track(user.username, "systemd", "stop", service.name, service.unit):
+        try:
+            result = systemd_service.stop(service.unit)
+            service.mark_service_down()
+            return {"server": service.name, **result}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/{server}/service/restart")
+def server_service_restart(
+    service: RCONService = Depends(get_server),
+    user: TokenData = Depends(require_roles(["admin", "operator"]))
+):
+    with audit_log.track(user.username, "systemd", "restart", service.name, service.unit):
+        try:
+            return {"server": service.name, **systemd_service.restart(service.unit)}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
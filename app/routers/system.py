@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from app.core.auth import require_roles, TokenData
 from app.services.systemd_service import systemd_service
+from app.services.rcon_service import rcon_service
+from app.services.audit_log import audit_log
 
 router = APIRouter(
     prefix="/system",
@@ -18,42 +20,51 @@ def minecraft_status(
 ):
     """Obtiene el estado del servicio Minecraft"""
     try:
-        return systemd_service.status("minecraft")
+        status = systemd_service.status("minecraft")
+        if status["state"] in ("inactive", "failed"):
+            # RCON fallará seguro: se evita que las peticiones esperen al timeout
+            rcon_service.mark_service_down()
+        return status
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/minecraft/start")
 def minecraft_start(
-    _: TokenData = Depends(require_roles(["admin", "operator"]))
+    user: TokenData = Depends(require_roles(["admin", "operator"]))
 ):
     """Inicia el servidor Minecraft"""
-    try:
-        return systemd_service.start("minecraft")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    with audit_log.track(user.username, "systemd", "start", rcon_service.name, "minecraft"):
+        try:
+            return systemd_service.start("minecraft")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/minecraft/stop")
 def minecraft_stop(
-    _: TokenData = Depends(require_roles(["admin"]))
+    user: TokenData = Depends(require_roles(["admin"]))
 ):
     """Detiene el servidor Minecraft (solo admin)"""
-    try:
-        return systemd_service.stop("minecraft")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    with audit_log.track(user.username, "systemd", "stop", rcon_service.name, "minecraft"):
+        try:
+            result = systemd_service.stop("minecraft")
+            rcon_service.mark_service_down()
+            return result
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/minecraft/restart")
 def minecraft_restart(
-    _: TokenData = Depends(require_roles(["admin", "operator"]))
+    user: TokenData = Depends(require_roles(["admin", "operator"]))
 ):
     """Reinicia el servidor Minecraft"""
-    try:
-        return systemd_service.restart("minecraft")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    with audit_log.track(user.username, "systemd", "restart", rcon_service.name, "minecraft"):
+        try:
+            return systemd_service.restart("minecraft")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/minecraft/logs")
@@ -113,35 +124,38 @@ def playit_status(
 
 @router.post("/playit/start")
 def playit_start(
-    _: TokenData = Depends(require_roles(["admin", "operator"]))
+    user: TokenData = Depends(require_roles(["admin", "operator"]))
 ):
     """Inicia el agente Playit"""
-    try:
-        return systemd_service.start("playit")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    with audit_log.track(user.username, "systemd", "start", None, "playit"):
+        try:
+            return systemd_service.start("playit")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/playit/stop")
 def playit_stop(
-    _: TokenData = Depends(require_roles(["admin"]))
+    user: TokenData = Depends(require_roles(["admin"]))
 ):
     """Detiene el agente Playit"""
-    try:
-        return systemd_service.stop("playit")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    with audit_log.track(user.username, "systemd", "stop", None, "playit"):
+        try:
+            return systemd_service.stop("playit")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/playit/restart")
 def playit_restart(
-    _: TokenData = Depends(require_roles(["admin", "operator"]))
+    user: TokenData = Depends(require_roles(["admin", "operator"]))
 ):
     """Reinicia el agente Playit"""
-    try:
-        return systemd_service.restart("playit")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    with audit_log.track(user.username, "systemd", "restart", None, "playit"):
+        try:
+            return systemd_service.restart("playit")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/playit/logs")
@@ -173,6 +187,8 @@ def system_status(
     try:
         minecraft = systemd_service.status("minecraft")
         playit = systemd_service.status("playit")
+        if minecraft["state"] in ("inactive", "failed"):
+            rcon_service.mark_service_down()
         
         return {
             "minecraft": minecraft,
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+import sys
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.core.pagination import decode_cursor, encode_cursor
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate, UserOut
+from app.schemas.user import UserCreate, UserUpdate, UserOut, UserPage
 from app.core.auth import (
-    get_password_hash,
+    get_password_hash_async,
+    get_user_by_username,
+    invalidate_principal,
     require_roles,
     TokenData
 )
@@ -14,73 +20,136 @@ router = APIRouter(
     tags=["Users"]
 )
 
+USER_FIELDS = ("id", "username", "roles")
+
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    """Menor cadena mayor que todas las que empiezan por `prefix` (None = sin cota)"""
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    code = ord(prefix[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        # Los surrogates no se pueden codificar en UTF-8: siguiente carácter válido
+        code = 0xE000
+    return prefix[:-1] + chr(code)
+
 # =====================
 # LIST USERS (ADMIN)
 # =====================
-@router.get("/", response_model=list[UserOut])
-def list_users(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=UserPage, response_model_exclude_unset=True)
+async def list_users(
+    prefix: Optional[str] = Query(None, description="Usernames que empiezan por (distingue mayúsculas)"),
+    role: Optional[Literal["admin", "operator", "viewer"]] = None,
+    fields: Optional[str] = Query(None, description="Campos separados por comas: id,username,roles"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    db: AsyncSession = Depends(get_async_db),
     _: TokenData = Depends(require_roles(["admin"]))
 ):
-    return db.query(User).all()
+    """
+    Usuarios por orden de username, paginados por keyset sobre su índice.
+
+    El prefijo se traduce en un rango (username >= prefijo AND username <
+    siguiente prefijo), que SQLite resuelve con el índice de username;
+    el filtro de rol se comprueba sobre las filas de ese recorrido.
+    """
+    selected = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(USER_FIELDS)
+    unknown = [f for f in selected if f not in USER_FIELDS]
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos no válidos: {', '.join(unknown) or '(ninguno)'}. Disponibles: {', '.join(USER_FIELDS)}"
+        )
+
+    # username siempre se lee: es la clave del cursor
+    columns = [User.username] + [getattr(User, f) for f in selected if f != "username"]
+    query = select(*columns).order_by(User.username).limit(limit + 1)
+
+    after = decode_cursor(cursor, (str,))
+    if after is not None:
+        query = query.where(User.username > after[0])
+    if prefix:
+        query = query.where(User.username >= prefix)
+        upper = _prefix_upper_bound(prefix)
+        if upper is not None:
+            query = query.where(User.username < upper)
+    if role:
+        # roles es texto "admin,operator": se compara como ",admin,operator,"
+        padded = literal(",") + func.replace(func.coalesce(User.roles, ""), " ", "") + literal(",")
+        query = query.where(padded.contains(f",{role},"))
+
+    rows = (await db.execute(query)).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["username"])
+    return {
+        "items": [{f: row[f] for f in selected} for row in rows],
+        "next_cursor": next_cursor
+    }
 
 # =====================
 # CREATE USER (ADMIN)
 # =====================
 @router.post("/", response_model=UserOut)
-def create_user(
+async def create_user(
     data: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: TokenData = Depends(require_roles(["admin"]))
 ):
-    if db.query(User).filter(User.username == data.username).first():
+    if await get_user_by_username(db, data.username):
         raise HTTPException(status_code=400, detail="Usuario ya existe")
 
     user = User(
         username=data.username,
-        password_hash=get_password_hash(data.password),
+        password_hash=await get_password_hash_async(data.password),
         roles=data.roles
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 # =====================
 # UPDATE USER (ADMIN)
 # =====================
 @router.put("/{user_id}")
-def update_user(
+async def update_user(
     user_id: int,
     data: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: TokenData = Depends(require_roles(["admin"]))
 ):
-    user = db.query(User).get(user_id)
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
     if data.password:
-        user.password_hash = get_password_hash(data.password)
+        user.password_hash = await get_password_hash_async(data.password)
     if data.roles:
         user.roles = data.roles
 
-    db.commit()
+    await db.commit()
+    await invalidate_principal(db, user.username)
     return {"success": True}
 
 # =====================
 # DELETE USER (ADMIN)
 # =====================
 @router.delete("/{user_id}")
-def delete_user(
+async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: TokenData = Depends(require_roles(["admin"]))
 ):
-    user = db.query(User).get(user_id)
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
-    db.delete(user)
-    db.commit()
+    username = user.username
+    await db.delete(user)
+    await db.commit()
+    await invalidate_principal(db, username)
     return {"success": True}
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+class AuditEntryOut(BaseModel):
+    id: int
+    created_at: float  # epoch en segundos
+    username: str
+    action: str
+    verb: str
+    server: Optional[str] = None
+    target: Optional[str] = None
+    command: Optional[str] = None
+    outcome: str
+    result: Optional[str] = None
+    latency_ms: float
+
+    class Config:
+        from_attributes = True
+
+class AuditPage(BaseModel):
+    items: List[AuditEntryOut]
+    next_cursor: Optional[str] = None  # None = no hay más resultados
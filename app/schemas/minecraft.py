@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class CommandRequest(BaseModel):
+    command: str
+
+class MessageRequest(BaseModel):
+    message: str
+
+class BatchCommandRequest(BaseModel):
+    commands: List[str] = Field(..., min_length=1, max_length=500)
+    parallel: bool = False  # True = repartir entre las conexiones del pool, sin orden garantizado
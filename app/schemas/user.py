@@ -17,3 +17,13 @@ class UserOut(UserBase):
 
     class Config:
         from_attributes = True
+
+class UserListItem(BaseModel):
+    # Solo se devuelven los campos pedidos en `fields`
+    id: Optional[int] = None
+    username: Optional[str] = None
+    roles: Optional[str] = None
+
+class UserPage(BaseModel):
+    items: List[UserListItem]
+    next_cursor: Optional[str] = None  # None = no hay más resultados
@@ -0,0 +1,332 @@
+"""
+Registro de auditoría con escritura diferida (write-behind).
+
+Las rutas encolan el registro en memoria y responden sin esperar a
+SQLite; una tarea en segundo plano vacía la cola en lotes de hasta
+AUDIT_BATCH_SIZE filas, en una sola transacción, cada
+AUDIT_FLUSH_INTERVAL_MS o en cuanto hay un lote completo.
+
+La cola está acotada (AUDIT_QUEUE_SIZE). Con la cola llena, una ruta
+async espera como mucho AUDIT_ENQUEUE_TIMEOUT a que el escritor libere
+sitio (contrapresión); si no lo hay, o si la ruta es síncrona, el
+registro se descarta y se cuenta en `dropped`.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
+from app.models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+
+OUTCOME_SUCCESS = "success"
+OUTCOME_ERROR = "error"
+OUTCOME_DENIED = "denied"
+
+
+def command_verb(command: str) -> str:
+    """Primera palabra del comando, en minúsculas y sin barra inicial"""
+    parts = command.strip().split(None, 1)
+    return parts[0].lstrip("/").lower() if parts else ""
+
+
+class AuditTracker:
+    """
+    Mide una acción y la registra al terminar.
+
+    `with` en rutas síncronas (nunca bloquea) y `async with` en rutas
+    async (contrapresión). Una excepción dentro del bloque se registra
+    como error (un 403 como "denied") y se propaga sin cambios.
+    """
+
+    def __init__(self, writer: "AuditLogWriter", entry: Dict[str, Any]):
+        self.writer = writer
+        self.entry = entry
+        self._started = 0.0
+
+    def set_result(self, result: Any, outcome: Optional[str] = None) -> None:
+        text = "" if result is None else str(result)
+        if outcome is None:
+            # execute() devuelve los errores RCON como texto
+            outcome = OUTCOME_ERROR if text.startswith("Error:") else OUTCOME_SUCCESS
+        self.entry["outcome"] = outcome
+        self.entry["result"] = text[:settings.AUDIT_RESULT_MAX_CHARS]
+
+    def _finish(self, exc: Optional[BaseException]) -> List[Dict[str, Any]]:
+        if exc is not None:
+            if isinstance(exc, HTTPException):
+                outcome = OUTCOME_DENIED if exc.status_code == 403 else OUTCOME_ERROR
+                self.set_result(exc.detail, outcome)
+            else:
+                self.set_result(exc, OUTCOME_ERROR)
+        elif "outcome" not in self.entry:
+            self.set_result(None, OUTCOME_SUCCESS)
+        self.entry["latency_ms"] = round((time.perf_counter() - self._started) * 1000, 3)
+        self.entry["created_at"] = time.time()
+        return [self.entry]
+
+    def __enter__(self) -> "AuditTracker":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        for entry in self._finish(exc):
+            self.writer.submit(entry)
+        return False
+
+    async def __aenter__(self) -> "AuditTracker":
+        self._started = time.perf_counter()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        for entry in self._finish(exc):
+            await self.writer.put(entry)
+        return False
+
+
+class BatchAuditTracker(AuditTracker):
+    """Un registro por comando del lote, todos con la latencia del lote completo"""
+
+    def __init__(self, writer: "AuditLogWriter", entry: Dict[str, Any], commands: List[str]):
+        super().__init__(writer, entry)
+        self.commands = commands
+        self.results: Optional[List[Dict]] = None
+
+    def set_results(self, results: List[Dict]) -> None:
+        self.results = results
+
+    def _finish(self, exc: Optional[BaseException]) -> List[Dict[str, Any]]:
+        shared = super()._finish(exc)[0]
+        if self.results is None:
+            # Lote rechazado o fallido antes de ejecutar: mismo resultado para todos
+            outcomes = [(shared["outcome"], shared["result"])] * len(self.commands)
+        else:
+            outcomes = [
+                (OUTCOME_SUCCESS, r.get("response")) if r["success"] else (OUTCOME_ERROR, r.get("error"))
+                for r in self.results
+            ]
+        max_chars = settings.AUDIT_RESULT_MAX_CHARS
+        return [
+            {
+                **shared,
+                "verb": command_verb(command),
+                "command": command[:max_chars],
+                "outcome": outcome,
+                "result": None if result is None else str(result)[:max_chars],
+            }
+            for command, (outcome, result) in zip(self.commands, outcomes)
+        ]
+
+
+class AuditLogWriter:
+    def __init__(self, max_queue: int, batch_size: int, flush_interval: float, enqueue_timeout: float):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        # deque + lock: las rutas síncronas encolan desde hilos del threadpool
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.write_errors = 0
+        self.backpressure_waits = 0
+
+    # =====================
+    # PRODUCTORES
+    # =====================
+
+    def track(
+        self,
+        username: str,
+        action: str,
+        verb: str,
+        server: Optional[str] = None,
+        target: Optional[str] = None,
+        command: Optional[str] = None,
+    ) -> AuditTracker:
+        return AuditTracker(self, {
+            "username": username,
+            "action": action,
+            "verb": verb,
+            "server": server,
+            "target": target,
+            "command": command[:settings.AUDIT_RESULT_MAX_CHARS] if command else command,
+        })
+
+    def track_batch(self, username: str, server: Optional[str], commands: List[str]) -> BatchAuditTracker:
+        entry = {"username": username, "action": "rcon", "verb": "", "server": server, "target": None}
+        return BatchAuditTracker(self, entry, commands)
+
+    def submit(self, entry: Dict[str, Any]) -> bool:
+        """Encola sin bloquear nunca; False si la cola está llena y se descarta"""
+        if self._append(entry):
+            return True
+        with self._lock:
+            self.dropped += 1
+        self._notify()
+        return False
+
+    async def put(self, entry: Dict[str, Any]) -> bool:
+        """Encola desde una ruta async; con la cola llena espera hasta enqueue_timeout"""
+        if self._append(entry):
+            return True
+        if self._task is not None and self.enqueue_timeout > 0:
+            self.backpressure_waits += 1
+            deadline = time.monotonic() + self.enqueue_timeout
+            while (remaining := deadline - time.monotonic()) > 0:
+                self._space.clear()
+                self._wake.set()
+                try:
+                    await asyncio.wait_for(self._space.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if self._append(entry):
+                    return True
+        with self._lock:
+            self.dropped += 1
+        return False
+
+    def _append(self, entry: Dict[str, Any]) -> bool:
+        with self._lock:
+            if len(self._queue) >= self.max_queue:
+                return False
+            self._queue.append(entry)
+            self.enqueued += 1
+            full_batch = len(self._queue) >= self.batch_size
+        if full_batch:
+            self._notify()
+        return True
+
+    def _notify(self) -> None:
+        """Despierta al escritor; seguro tanto desde el event loop como desde hilos"""
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._wake.set()
+        else:
+            try:
+                loop.call_soon_threadsafe(self._wake.set)
+            except RuntimeError:
+                pass  # loop cerrado durante el apagado
+
+    # =====================
+    # ESCRITOR
+    # =====================
+
+    def start(self) -> None:
+        """Arranca la tarea de escritura (en el startup de la app)"""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._space = asyncio.Event()
+        self._closing = False
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Escribe lo pendiente y detiene la tarea"""
+        if self._task is None:
+            return
+        self._closing = True
+        self._wake.set()
+        await self._task
+        self._task = None
+        self._loop = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+            if self._closing:
+                if self._queue:
+                    logger.warning("Auditoría: %d registros sin escribir al apagar", len(self._queue))
+                return
+
+    async def flush(self) -> int:
+        """Escribe la cola en lotes; devuelve cuántos registros se guardaron"""
+        saved = 0
+        while True:
+            with self._lock:
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            if not batch:
+                return saved
+            if self._space is not None:
+                self._space.set()
+            try:
+                await self._write(batch)
+            except Exception as e:
+                self.write_errors += 1
+                logger.warning("Auditoría: no se pudo escribir un lote de %d registros: %s", len(batch), e)
+                self._requeue(batch)
+                return saved
+            self.batches += 1
+            self.written += len(batch)
+            saved += len(batch)
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(AuditLog), batch)
+            await db.commit()
+
+    def _requeue(self, batch: List[Dict[str, Any]]) -> None:
+        """Devuelve un lote fallido al frente de la cola; lo que no cabe se descarta"""
+        with self._lock:
+            room = max(0, self.max_queue - len(self._queue))
+            keep = batch[:room]
+            self._queue.extendleft(reversed(keep))
+            self.dropped += len(batch) - len(keep)
+
+    def stats(self) -> Dict:
+        return {
+            "queued": len(self._queue),
+            "max_queue": self.max_queue,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "write_errors": self.write_errors,
+            "backpressure_waits": self.backpressure_waits,
+        }
+
+
+audit_log = AuditLogWriter(
+    max_queue=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_MS / 1000,
+    enqueue_timeout=settings.AUDIT_ENQUEUE_TIMEOUT,
+)
+metrics.register_callback(
+    "audit_queue_depth", "gauge", "Registros de auditoría pendientes de escribir",
+    lambda: len(audit_log._queue))
+metrics.register_callback(
+    "audit_written_total", "counter", "Registros de auditoría escritos en la BD",
+    lambda: audit_log.written)
+metrics.register_callback(
+    "audit_dropped_total", "counter", "Registros de auditoría descartados con la cola llena",
+    lambda: audit_log.dropped)
@@ -0,0 +1,98 @@
+import time
+from typing import Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class RCONUnavailableError(Exception):
+    """El circuito está abierto: el servidor no responde y no se intenta conectar"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Servidor Minecraft no disponible: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker para las llamadas RCON.
+
+    - closed: las llamadas pasan; tras `failure_threshold` fallos de
+      conexión seguidos se abre.
+    - open: las llamadas fallan al instante con RCONUnavailableError
+      hasta que vence el backoff.
+    - half_open: se deja pasar una única llamada de prueba. Si funciona
+      se cierra; si falla se vuelve a abrir duplicando el backoff
+      (hasta `max_backoff`).
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        base_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.state = CLOSED
+        self.reason = ""
+        self._failures = 0
+        self._backoff = base_backoff
+        self._retry_at = 0.0
+        self._opened_at: Optional[float] = None
+
+    def _open(self, reason: str) -> None:
+        now = time.monotonic()
+        if self.state != OPEN:
+            self._opened_at = now
+        self.state = OPEN
+        self.reason = reason
+        self._retry_at = now + self._backoff
+
+    def retry_after(self) -> float:
+        return max(0.0, self._retry_at - time.monotonic())
+
+    def before_call(self) -> None:
+        """Lanza RCONUnavailableError si la llamada no debe intentarse"""
+        if self.state == CLOSED:
+            return
+        if self.state == OPEN and time.monotonic() >= self._retry_at:
+            # Esta llamada hace de sonda; las demás siguen fallando rápido
+            self.state = HALF_OPEN
+            return
+        raise RCONUnavailableError(self.reason, self.retry_after())
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.reason = ""
+        self._failures = 0
+        self._backoff = self.base_backoff
+        self._opened_at = None
+
+    def record_failure(self, reason: str) -> None:
+        if self.state == HALF_OPEN:
+            self._backoff = min(self._backoff * 2, self.max_backoff)
+            self._open(reason)
+            return
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            self._open(reason)
+
+    def force_open(self, reason: str) -> None:
+        """Abre el circuito sin esperar a acumular fallos (p.ej. servicio parado)"""
+        if self.state == HALF_OPEN:
+            self._backoff = min(self._backoff * 2, self.max_backoff)
+        self._open(reason)
+
+    def snapshot(self) -> Dict:
+        return {
+            "state": self.state,
+            "reason": self.reason or None,
+            "consecutive_failures": self._failures,
+            "retry_after": round(self.retry_after(), 2) if self.state != CLOSED else 0,
+            "open_for": round(time.monotonic() - self._opened_at, 2) if self._opened_at else 0,
+        }
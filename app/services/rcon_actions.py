@@ -0,0 +1,133 @@
+"""
+Acciones RCON compartidas por las rutas del servidor principal
+(/minecraft/...) y las de cada servidor (/minecraft/{server}/...).
+
+Cada función recibe el RCONService sobre el que actuar: valida el
+comando, lo registra en auditoría y convierte los errores en
+HTTPException, de modo que ambas rutas responden exactamente igual.
+"""
+from typing import Any, Awaitable, Dict, List
+
+from fastapi import HTTPException
+
+from app.core.auth import TokenData
+from app.core.command_validator import validate_command
+from app.core.rate_limit import enforce_rate_limit
+from app.services.audit_log import audit_log, command_verb
+from app.services.circuit_breaker import RCONUnavailableError
+from app.services.rcon_service import RCONService
+
+
+async def _call(action: Awaitable[Any]) -> Any:
+    """Espera la llamada RCON; los errores que no son del circuito se devuelven como 500"""
+    try:
+        return await action
+    except RCONUnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# =====================
+# COMANDOS
+# =====================
+
+async def run_command(service: RCONService, command: str, user: TokenData) -> Dict:
+    """Ejecuta un comando RCON genérico (validado)"""
+    async with audit_log.track(user.username, "rcon", command_verb(command), service.name, command=command) as audit:
+        # Validar comando según el rol del usuario
+        if not validate_command(command, user.role_mask):
+            raise HTTPException(
+                status_code=403,
+                detail=f"Comando no permitido para tu rol: {command}"
+            )
+
+        result = await _call(service.execute(command))
+        audit.set_result(result)
+        return {
+            "success": True,
+            "server": service.name,
+            "command": command,
+            "executed_by": user.username,
+            "response": result
+        }
+
+
+async def run_batch(service: RCONService, commands: List[str], parallel: bool, user: TokenData) -> Dict:
+    """Ejecuta una lista de comandos RCON (validados), en orden salvo con `parallel`"""
+    # Se valida todo antes de ejecutar nada: o se ejecuta el lote completo o nada
+    rejected = [cmd for cmd in commands if not validate_command(cmd, user.role_mask)]
+    if not rejected:
+        # Un token por comando, como mucho la ráfaga entera (ver enforce_rate_limit);
+        # un lote rechazado por la política no gasta nada
+        enforce_rate_limit(user, len(commands))
+    async with audit_log.track_batch(user.username, service.name, commands) as audit:
+        if rejected:
+            raise HTTPException(
+                status_code=403,
+                detail={
+                    "message": "Comandos no permitidos para tu rol",
+                    "rejected": rejected
+                }
+            )
+
+        results = await _call(service.execute_batch(commands, parallel=parallel))
+        audit.set_results(results)
+        return {
+            "success": all(r["success"] for r in results),
+            "server": service.name,
+            "total": len(results),
+            "failed": sum(1 for r in results if not r["success"]),
+            "executed_by": user.username,
+            "results": results
+        }
+
+
+async def send_message(service: RCONService, message: str, user: TokenData) -> Dict:
+    response = await _call(service.send_message(message))
+    return {
+        "success": True,
+        "server": service.name,
+        "message": message,
+        "sent_by": user.username,
+        "response": response
+    }
+
+# =====================
+# MODERACIÓN
+# =====================
+
+async def whitelist_add(service: RCONService, player: str) -> Dict:
+    response = await _call(service.whitelist_add(player))
+    return {"success": True, "server": service.name, "player": player, "response": response}
+
+
+async def whitelist_remove(service: RCONService, player: str) -> Dict:
+    response = await _call(service.whitelist_remove(player))
+    return {"success": True, "server": service.name, "player": player, "response": response}
+
+
+async def _moderate(
+    service: RCONService, user: TokenData, verb: str, player: str, command: str, **extra: Any
+) -> Dict:
+    async with audit_log.track(user.username, "rcon", verb, service.name, player, command) as audit:
+        response = await _call(service.execute(command))
+        audit.set_result(response)
+        return {"success": True, "server": service.name, "player": player, **extra, "response": response}
+
+
+async def kick_player(service: RCONService, player: str, reason: str, user: TokenData) -> Dict:
+    command = f"kick {player} {reason}".strip()
+    return await _moderate(service, user, "kick", player, command, reason=reason)
+
+
+async def ban_player(service: RCONService, player: str, reason: str, user: TokenData) -> Dict:
+    command = f"ban {player} {reason}".strip()
+    return await _moderate(service, user, "ban", player, command, reason=reason)
+
+
+async def pardon_player(service: RCONService, player: str, user: TokenData) -> Dict:
+    return await _moderate(service, user, "pardon", player, f"pardon {player}")
+
+
+async def make_op(service: RCONService, player: str, user: TokenData) -> Dict:
+    return await _moderate(service, user, "op", player, f"op {player}")
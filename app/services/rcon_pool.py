@@ -0,0 +1,182 @@
+import asyncio
+from typing import Callable, List, Optional
+
+from app.core.rcon_protocol import AsyncRCONClient, RCONNotSentError
+
+
+class RCONPool:
+    """
+    Pool de conexiones RCON persistentes.
+
+    Las conexiones se abren una vez (connect + login) y se comparten:
+    cada una ejecuta un comando a la vez (los demás esperan turno), así
+    que los comandos concurrentes se reparten entre conexiones.
+
+    Las conexiones que el servidor cierra (p.ej. al reiniciar) se
+    detectan en cuanto ocurre y se sustituyen en el siguiente comando. Las
+    que agotan el timeout de un comando se cierran: el servidor responde
+    en orden, así que quedan inservibles. Las que llevan más de
+    `healthcheck_interval` paradas se comprueban con un ping antes de
+    reutilizarse, y las que superan el tiempo máximo de inactividad se
+    cierran.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        password: str,
+        size: int = 4,
+        timeout: float = 5.0,
+        idle_timeout: float = 300.0,
+        healthcheck_interval: float = 30.0,
+        on_connect: Optional[Callable[[AsyncRCONClient], None]] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.size = size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.healthcheck_interval = healthcheck_interval
+        self.on_connect = on_connect
+
+        self._connections: List[AsyncRCONClient] = []
+        self._connect_lock: Optional[asyncio.Lock] = None
+
+        # Totales acumulados de las conexiones ya cerradas
+        self.connections_opened = 0
+        self.healthcheck_failures = 0
+        self._retired_commands = 0
+        self._retired_bytes_sent = 0
+        self._retired_bytes_received = 0
+
+    def _get_lock(self) -> asyncio.Lock:
+        # Se crea de forma perezosa para quedar ligado al event loop de uvicorn
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        return self._connect_lock
+
+    def _prune(self) -> None:
+        """Descarta conexiones muertas y cierra las ociosas"""
+        keep = []
+        for conn in self._connections:
+            if not conn.is_alive:
+                self._retire(conn)
+                continue
+            if conn.in_flight == 0 and conn.idle_for() > self.idle_timeout:
+                conn.close()
+                self._retire(conn)
+                continue
+            keep.append(conn)
+        self._connections = keep
+
+    def _retire(self, conn: AsyncRCONClient) -> None:
+        self._retired_commands += conn.commands_sent
+        self._retired_bytes_sent += conn.bytes_sent
+        self._retired_bytes_received += conn.bytes_received
+
+    def _pick(self) -> Optional[AsyncRCONClient]:
+        """Conexión con menos comandos en vuelo, o None si conviene abrir otra"""
+        if not self._connections:
+            return None
+        conn = min(self._connections, key=lambda c: c.in_flight)
+        if conn.in_flight == 0 or len(self._connections) >= self.size:
+            return conn
+        return None
+
+    async def acquire(self) -> AsyncRCONClient:
+        """
+        Devuelve la conexión con menos comandos en vuelo.
+
+        Solo se abre una conexión nueva si todas las existentes están
+        ocupadas y no se ha alcanzado el tamaño del pool. Una conexión
+        ociosa que no responde al ping se descarta y se elige otra.
+        """
+        while True:
+            conn = await self._acquire()
+            if await self._healthy(conn):
+                return conn
+
+    async def _healthy(self, conn: AsyncRCONClient) -> bool:
+        if conn.in_flight or conn.idle_for() < self.healthcheck_interval:
+            return True
+        try:
+            await conn.ping()
+            return True
+        except (ConnectionError, asyncio.TimeoutError):
+            self.healthcheck_failures += 1
+            conn.close()
+            return False
+
+    async def _acquire(self) -> AsyncRCONClient:
+        self._prune()
+        conn = self._pick()
+        if conn is not None:
+            return conn
+
+        # Un solo connect a la vez: evita la avalancha de logins cuando
+        # muchas peticiones llegan con el pool vacío
+        async with self._get_lock():
+            self._prune()
+            conn = self._pick()
+            if conn is not None:
+                return conn
+
+            conn = AsyncRCONClient(self.host, self.port, self.password, timeout=self.timeout)
+            await conn.connect()
+            self.connections_opened += 1
+            if self.on_connect is not None:
+                self.on_connect(conn)
+            self._connections.append(conn)
+            return conn
+
+    async def execute(self, command: str) -> str:
+        """
+        Ejecuta un comando usando una conexión del pool.
+
+        Si la conexión se cerró antes de escribir el comando (p.ej. el
+        servidor se reinició) se reintenta una vez con otra conexión. Un
+        comando ya escrito no se reintenta nunca: reenviar un give o un ban
+        podría ejecutarlo dos veces.
+        """
+        conn = await self.acquire()
+        try:
+            return await conn.run(command)
+        except RCONNotSentError:
+            pass
+        conn = await self.acquire()
+        return await conn.run(command)
+
+    def close(self) -> None:
+        connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+            self._retire(conn)
+
+    @property
+    def commands_sent(self) -> int:
+        return self._retired_commands + sum(c.commands_sent for c in self._connections)
+
+    @property
+    def bytes_sent(self) -> int:
+        return self._retired_bytes_sent + sum(c.bytes_sent for c in self._connections)
+
+    @property
+    def bytes_received(self) -> int:
+        return self._retired_bytes_received + sum(c.bytes_received for c in self._connections)
+
+    def reuse_ratio(self) -> float:
+        """Fracción de comandos que no necesitaron abrir una conexión nueva"""
+        commands = self.commands_sent
+        if not commands:
+            return 0.0
+        return max(0.0, 1 - self.connections_opened / commands)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "open": len(self._connections),
+            "in_flight": sum(c.in_flight for c in self._connections),
+            "healthcheck_failures": self.healthcheck_failures,
+        }
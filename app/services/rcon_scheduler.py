@@ -0,0 +1,127 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+# Menor número = más prioridad
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_NORMAL: "normal",
+    PRIORITY_BULK: "bulk",
+}
+
+# Acciones de administración que deben adelantarse a todo lo demás
+INTERACTIVE_VERBS = {"stop", "kick", "ban", "ban-ip", "save-all"}
+
+
+def priority_for(command: str) -> int:
+    verb = command.strip().split(" ", 1)[0].lower()
+    return PRIORITY_INTERACTIVE if verb in INTERACTIVE_VERBS else PRIORITY_NORMAL
+
+
+class _WaitStats:
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: Deque[float] = deque(maxlen=1024)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def snapshot(self) -> Dict:
+        recent = sorted(self.recent)
+
+        def pct(p: float) -> float:
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1000, 2) if recent else 0.0
+
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+class RCONScheduler:
+    """
+    Cola de despacho con prioridades para el tráfico RCON saliente.
+
+    Limita los comandos en vuelo contra el servidor a `max_in_flight`.
+    Cuando no hay hueco, el comando espera en un heap ordenado por
+    (prioridad, orden de llegada): al liberarse un hueco pasa el de mayor
+    prioridad, así un `kick` no queda detrás de cientos de comandos de un
+    lote de whitelist.
+    """
+
+    def __init__(self, max_in_flight: int = 4):
+        self.max_in_flight = max_in_flight
+        self._in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._depth: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+        self._waits: Dict[int, _WaitStats] = {p: _WaitStats() for p in PRIORITY_NAMES}
+
+    async def _acquire(self, priority: int) -> None:
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._depth[priority] += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Nos cedieron el hueco justo al cancelarnos: se devuelve
+                self._release()
+            raise
+        finally:
+            self._depth[priority] -= 1
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # El hueco pasa directamente al siguiente; _in_flight no cambia
+                future.set_result(None)
+                return
+        self._in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[int] = None) -> AsyncIterator[None]:
+        """Espera un hueco según la prioridad y lo libera al salir"""
+        if priority is None:
+            priority = PRIORITY_NORMAL
+        enqueued = time.monotonic()
+        await self._acquire(priority)
+        self._waits[priority].add(time.monotonic() - enqueued)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> Dict:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "queue_depth": sum(self._depth.values()),
+            "by_priority": {
+                name: {"queued": self._depth[p], "wait": self._waits[p].snapshot()}
+                for p, name in PRIORITY_NAMES.items()
+            },
+        }
@@ -1,62 +1,322 @@
 import asyncio
-from rcon.source import rcon 
-from typing import Dict, List
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
 import re
+from app.core.cache import SingleFlightCache
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.rcon_protocol import AsyncRCONClient
+from app.services.circuit_breaker import CircuitBreaker, RCONUnavailableError, CLOSED, HALF_OPEN, OPEN
+from app.services.rcon_pool import RCONPool
+from app.services.rcon_scheduler import RCONScheduler, PRIORITY_BULK, priority_for
+from app.services.systemd_service import systemd_service
+
+# Verbos que cambian quién está conectado
+MEMBERSHIP_VERBS = {"kick", "ban", "ban-ip"}
+
+
+logger = logging.getLogger(__name__)
+
+# Las etiquetas de verbo se acotan para no disparar la cardinalidad
+_VERB_RE = re.compile(r"[a-z][a-z0-9_-]{0,31}")
+_MAX_VERB_LABELS = 64
+_verb_labels: set = set()
+
+
+def verb_label(command: str) -> str:
+    verb = command.strip().split(" ", 1)[0].lower()
+    if verb in _verb_labels:
+        return verb
+    if _VERB_RE.fullmatch(verb) and len(_verb_labels) < _MAX_VERB_LABELS:
+        _verb_labels.add(verb)
+        return verb
+    return "other"
+
+
+metrics.describe("rcon_command_seconds", "histogram", "Latencia de comandos RCON por verbo (sin cola)")
+metrics.describe("rcon_phase_seconds", "histogram", "Duración de las fases queue, connect y login")
+metrics.describe("rcon_timeouts_total", "counter", "Comandos RCON que agotaron el timeout")
+metrics.describe("rcon_errors_total", "counter", "Comandos RCON fallidos (sin contar timeouts)")
+metrics.describe("rcon_unavailable_total", "counter", "Comandos rechazados con el circuito abierto")
 
 class RCONService:
-    def __init__(self):
-        self.host = settings.RCON_HOST
-        self.port = settings.RCON_PORT
-        self.password = settings.RCON_PASSWORD
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        password: Optional[str] = None,
+        unit: str = "minecraft",
+    ):
+        """
+        Args:
+            name: nombre del servidor en el registro (etiqueta de métricas)
+            unit: unidad systemd del servidor ("minecraft" = MINECRAFT_SERVICE)
+        """
+        self.name = name or settings.MINECRAFT_SERVER_NAME
+        self.host = host or settings.RCON_HOST
+        self.port = port or settings.RCON_PORT
+        self.password = password or settings.RCON_PASSWORD
+        self.unit = unit
+        self.service_down_reason = f"servicio {unit} inactivo"
+        self.pool = RCONPool(
+            self.host,
+            self.port,
+            self.password,
+            size=settings.RCON_POOL_SIZE,
+            timeout=settings.RCON_TIMEOUT,
+            idle_timeout=settings.RCON_POOL_IDLE_TIMEOUT,
+            healthcheck_interval=settings.RCON_POOL_HEALTHCHECK_INTERVAL,
+            on_connect=self._on_connect,
+        )
+        self.player_cache = SingleFlightCache(
+            self._load_player_list,
+            ttl=settings.PLAYER_LIST_CACHE_TTL,
+            stale_ttl=settings.PLAYER_LIST_STALE_TTL,
+        )
+        # Cada conexión ejecuta un comando a la vez: con más huecos que conexiones,
+        # los sobrantes esperarían turno en la conexión en orden de llegada y la
+        # prioridad de la cola dejaría de aplicarse
+        self.scheduler = RCONScheduler(
+            max_in_flight=min(settings.RCON_MAX_IN_FLIGHT, settings.RCON_POOL_SIZE)
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.RCON_BREAKER_FAILURE_THRESHOLD,
+            base_backoff=settings.RCON_BREAKER_BASE_BACKOFF,
+            max_backoff=settings.RCON_BREAKER_MAX_BACKOFF,
+        )
+        self._register_metrics()
+
+    def _register_metrics(self) -> None:
+        pool = self.pool
+        server = self.name
+        metrics.register_callback(
+            "rcon_bytes_sent_total", "counter", "Bytes enviados al servidor",
+            lambda: pool.bytes_sent, server=server)
+        metrics.register_callback(
+            "rcon_bytes_received_total", "counter", "Bytes recibidos del servidor",
+            lambda: pool.bytes_received, server=server)
+        metrics.register_callback(
+            "rcon_commands_sent_total", "counter", "Comandos enviados al servidor",
+            lambda: pool.commands_sent, server=server)
+        metrics.register_callback(
+            "rcon_connections_opened_total", "counter", "Conexiones RCON abiertas (connect + login)",
+            lambda: pool.connections_opened, server=server)
+        metrics.register_callback(
+            "rcon_connection_reuse_ratio", "gauge", "Fracción de comandos sin connect + login propio",
+            lambda: round(pool.reuse_ratio(), 4), server=server)
+        metrics.register_callback(
+            "rcon_queue_depth", "gauge", "Comandos esperando hueco en la cola de despacho",
+            lambda: self.scheduler.stats()["queue_depth"], server=server)
+        metrics.register_callback(
+            "rcon_breaker_open", "gauge", "1 si el circuito RCON no está cerrado",
+            lambda: 0 if self.breaker.state == CLOSED else 1, server=server)
 
-    async def execute(self, command: str) -> str:
+    def _on_connect(self, conn: AsyncRCONClient) -> None:
+        metrics.observe("rcon_phase_seconds", conn.connect_seconds, phase="connect", server=self.name)
+        metrics.observe("rcon_phase_seconds", conn.login_seconds, phase="login", server=self.name)
+
+    def mark_service_down(self) -> None:
+        """Abre el circuito: systemd informa de que el servidor está parado"""
+        self.breaker.force_open(self.service_down_reason)
+
+    async def _service_running(self) -> bool:
+        # None (systemd no consultable) cuenta como "puede que sí"
+        return await asyncio.to_thread(systemd_service.is_active, self.unit) is not False
+
+    async def _check_available(self) -> None:
+        """Falla al instante si el circuito está abierto"""
         try:
-            response = await rcon(
-                command, 
-                host=self.host, 
-                port=self.port, 
-                passwd=self.password,
-                timeout=5
-            )
-            return response if response else ""
+            self.breaker.before_call()
+            if self.breaker.state == HALF_OPEN and not await self._service_running():
+                # Sonda barata: si systemd dice que está parado no se abre ningún socket
+                self.breaker.record_failure(self.service_down_reason)
+                raise RCONUnavailableError(self.breaker.reason, self.breaker.retry_after())
+        except RCONUnavailableError:
+            metrics.inc("rcon_unavailable_total", server=self.name)
+            raise
+
+    async def _dispatch(
+        self, command: str, priority: int, send: Callable[[str], Awaitable[str]]
+    ) -> str:
+        """Espera turno en la cola, envía el comando y registra métricas"""
+        verb = verb_label(command)
+        enqueued = time.perf_counter()
+        try:
+            async with self.scheduler.slot(priority):
+                dispatched = time.perf_counter()
+                metrics.observe("rcon_phase_seconds", dispatched - enqueued, phase="queue", server=self.name)
+                if self.breaker.state == OPEN:
+                    # El circuito se abrió mientras esperaba en la cola (p.ej. un
+                    # lote con el servidor colgado): no se espera otro timeout
+                    metrics.inc("rcon_unavailable_total", server=self.name)
+                    raise RCONUnavailableError(self.breaker.reason, self.breaker.retry_after())
+                response = await send(command)
+        except RCONUnavailableError:
+            raise
+        except asyncio.TimeoutError:
+            metrics.inc("rcon_timeouts_total", verb=verb, server=self.name)
+            logger.warning("Timeout RCON ejecutando %r", command[:80])
+            raise
+        except Exception as e:
+            metrics.inc("rcon_errors_total", verb=verb, server=self.name)
+            logger.warning("Error RCON ejecutando %r: %s", command[:80], e)
+            raise
+        metrics.observe("rcon_command_seconds", time.perf_counter() - dispatched, verb=verb, server=self.name)
+        return response
+
+    async def _on_error(self, error: BaseException) -> None:
+        if isinstance(error, (OSError, asyncio.TimeoutError)):
+            # Fallo de conexión: cuenta para abrir el circuito
+            if self.breaker.state == CLOSED and not await self._service_running():
+                self.mark_service_down()
+            else:
+                self.breaker.record_failure(str(error) or type(error).__name__)
+        elif self.breaker.state == HALF_OPEN:
+            # La sonda no concluyó (cancelada u otro error): se reabre para
+            # no quedar atascado en half_open
+            self.breaker.record_failure(self.breaker.reason or "sonda interrumpida")
+
+    async def _run(self, command: str, priority: Optional[int] = None) -> str:
+        """Ejecuta un comando propagando los errores"""
+        await self._check_available()
+        if priority is None:
+            priority = priority_for(command)
+        try:
+            # Todas las llamadas pasan por el pool: sin connect + login por comando
+            response = await self._dispatch(command, priority, self.pool.execute)
+        except RCONUnavailableError:
+            raise
+        except BaseException as e:
+            await self._on_error(e)
+            raise
+        self.breaker.record_success()
+        self._after_command(command)
+        return response if response else ""
+
+    def _after_command(self, command: str) -> None:
+        # Los comandos que sacan jugadores del servidor dejan obsoleta la lista
+        verb = command.strip().split(" ", 1)[0].lower()
+        if verb in MEMBERSHIP_VERBS:
+            self.player_cache.invalidate()
+
+    async def execute(self, command: str, priority: Optional[int] = None) -> str:
+        try:
+            return await self._run(command, priority)
+        except RCONUnavailableError:
+            raise
         except Exception as e:
-            print(f"Error en RCON execute: {e}")
             return f"Error: {str(e)}"
 
+    async def execute_batch(self, commands: List[str], parallel: bool = False) -> List[Dict]:
+        """
+        Ejecuta varios comandos con prioridad baja.
+
+        Por defecto se ejecutan en orden, esperando cada respuesta antes de
+        enviar el siguiente. Con `parallel` se envían a la vez y se reparten
+        entre las conexiones del pool (cada conexión admite un solo comando
+        pendiente), sin garantía de orden.
+
+        Cada comando pasa por el circuito como uno suelto. En orden, un fallo
+        de conexión o timeout detiene el lote y el resto se marca como no
+        ejecutado; en paralelo, los que siguen en cola fallan al instante en
+        cuanto el circuito se abre.
+        """
+        await self._check_available()
+        try:
+            # Falla rápido para todo el lote si no se puede conectar
+            await self.pool.acquire()
+        except BaseException as e:
+            await self._on_error(e)
+            if not isinstance(e, Exception):
+                raise
+            logger.warning("Error RCON abriendo conexión para el lote: %s", e)
+            return [
+                {"command": command, "success": False, "error": str(e)}
+                for command in commands
+            ]
+        self.breaker.record_success()
+
+        async def run_one(command: str) -> str:
+            # Prioridad baja: un comando interactivo se cuela entre los del lote
+            return await self._run(command, PRIORITY_BULK)
+
+        if parallel:
+            responses = await asyncio.gather(
+                *(run_one(command) for command in commands),
+                return_exceptions=True
+            )
+        else:
+            responses = []
+            for command in commands:
+                try:
+                    responses.append(await run_one(command))
+                except Exception as e:
+                    responses.append(e)
+                    if isinstance(e, (OSError, asyncio.TimeoutError, RCONUnavailableError)):
+                        # Fallo de conexión: los comandos siguientes dependen del
+                        # orden, así que no se envían
+                        break
+
+        results = []
+        for index, command in enumerate(commands):
+            if index >= len(responses):
+                results.append({"command": command, "success": False, "error": "No ejecutado: falló un comando anterior"})
+                continue
+            response = responses[index]
+            if isinstance(response, BaseException):
+                results.append({"command": command, "success": False, "error": str(response) or type(response).__name__})
+            else:
+                results.append({"command": command, "success": True, "response": response})
+        return results
+
     async def get_player_list(self) -> Dict:
-        """Obtiene lista de jugadores limpiando códigos de color (§)"""
+        """
+        Obtiene lista de jugadores limpiando códigos de color (§)
+
+        Las peticiones concurrentes comparten una única llamada `list` en
+        vuelo y el resultado se cachea unos instantes (ver SingleFlightCache).
+        """
         try:
-            raw_response = await self.execute("list")
-            
-            # 1. LIMPIEZA: Eliminamos los códigos de color (§ seguido de cualquier carácter)
-            # Esto transforma "§6There are §c0" en "There are 0"
-            clean_response = re.sub(r'§.', '', raw_response)
-            
-            # 2. EXTRAER NÚMEROS: Ahora que el texto está limpio de símbolos raros
-            numbers = re.findall(r'\d+', clean_response)
-            
-            online = int(numbers[0]) if len(numbers) > 0 else 0
-            # Si el servidor dice "0 out of 20", online=0, max=20
-            max_players = int(numbers[1]) if len(numbers) > 1 else 20
-            
-            # 3. EXTRAER NOMBRES
-            players = []
-            if ":" in clean_response:
-                parts = clean_response.split(":", 1)
-                if len(parts) > 1 and parts[1].strip():
-                    players = [p.strip() for p in parts[1].split(",") if p.strip()]
-            
-            return {
-                "online": online,
-                "max": max_players,
-                "players": players
-            }
-            
+            players, age = await self.player_cache.get()
+            return {**players, "cache_age": round(age, 3)}
+        except RCONUnavailableError:
+            raise
         except Exception as e:
-            print(f"Error parseando lista de jugadores: {e}")
+            logger.warning("Error obteniendo lista de jugadores: %s", e)
             return {"online": 0, "max": 20, "players": [], "error": str(e)}
 
+    async def _load_player_list(self) -> Dict:
+        # El sondeo de jugadores es tráfico de fondo
+        return self._parse_player_list(await self._run("list", PRIORITY_BULK))
+
+    @staticmethod
+    def _parse_player_list(raw_response: str) -> Dict:
+        # 1. LIMPIEZA: Eliminamos los códigos de color (§ seguido de cualquier carácter)
+        # Esto transforma "§6There are §c0" en "There are 0"
+        clean_response = re.sub(r'§.', '', raw_response)
+        
+        # 2. EXTRAER NÚMEROS: Ahora que el texto está limpio de símbolos raros
+        numbers = re.findall(r'\d+', clean_response)
+        
+        online = int(numbers[0]) if len(numbers) > 0 else 0
+        # Si el servidor dice "0 out of 20", online=0, max=20
+        max_players = int(numbers[1]) if len(numbers) > 1 else 20
+        
+        # 3. EXTRAER NOMBRES
+        players = []
+        if ":" in clean_response:
+            parts = clean_response.split(":", 1)
+            if len(parts) > 1 and parts[1].strip():
+                players = [p.strip() for p in parts[1].split(",") if p.strip()]
+        
+        return {
+            "online": online,
+            "max": max_players,
+            "players": players
+        }
+
     async def send_message(self, message: str) -> str:
         return await self.execute(f"say {message}")
 
@@ -81,4 +341,7 @@ class RCONService:
     async def whitelist_remove(self, player: str) -> str:
         return await self.execute(f"whitelist remove {player}")
 
+    def close(self) -> None:
+        self.pool.close()
+
 rcon_service = RCONService()
\ No newline at end of file
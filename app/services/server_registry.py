@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.circuit_breaker import RCONUnavailableError
+from app.services.rcon_service import RCONService, rcon_service
+
+logger = logging.getLogger(__name__)
+
+# Primeros segmentos de las rutas /minecraft/* existentes: un servidor con
+# uno de estos nombres quedaría oculto detrás de la ruta fija
+RESERVED_NAMES = {
+    "players", "op", "command", "commands", "queue", "metrics", "message",
+    "whitelist", "kick", "ban", "pardon", "servers", "fleet",
+}
+
+
+class ServerRegistry:
+    """
+    Registro de servidores Minecraft administrados.
+
+    Cada servidor tiene su propio RCONService (pool, cola, caché y
+    circuito) y su unidad systemd. El servidor principal es el
+    `rcon_service` configurado con RCON_* y MINECRAFT_SERVICE; el resto
+    se declara en MINECRAFT_SERVERS.
+    """
+
+    def __init__(self, primary: RCONService, extra: List[dict]):
+        self._servers: Dict[str, RCONService] = {primary.name: primary}
+        for entry in extra:
+            name = str(entry.get("name", "")).strip()
+            if not name or name in RESERVED_NAMES or name in self._servers:
+                logger.warning("Servidor Minecraft ignorado (nombre vacío, reservado o repetido): %r", name)
+                continue
+            self._servers[name] = RCONService(
+                name=name,
+                host=entry.get("host"),
+                port=entry.get("port"),
+                password=entry.get("password"),
+                unit=entry.get("service") or name,
+            )
+
+    def get(self, name: str) -> Optional[RCONService]:
+        return self._servers.get(name)
+
+    def names(self) -> List[str]:
+        return list(self._servers)
+
+    def describe(self) -> List[Dict]:
+        return [
+            {
+                "name": service.name,
+                "host": service.host,
+                "port": service.port,
+                "service": service.unit,
+                "breaker": service.breaker.snapshot()["state"],
+            }
+            for service in self._servers.values()
+        ]
+
+    async def fan_out(
+        self,
+        fn: Callable[[RCONService], Awaitable[Any]],
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Dict]:
+        """
+        Ejecuta `fn` contra todos los servidores a la vez.
+
+        Cada servidor tiene su propio timeout: uno lento o caído no retrasa
+        al resto más allá de `timeout` ni hace fallar la operación completa.
+        El timeout nunca es menor que RCON_TIMEOUT: el comando expira en el
+        propio cliente RCON en vez de cancelarse desde fuera tras escribirse.
+        """
+        if timeout is None:
+            timeout = settings.FLEET_TIMEOUT
+        timeout = max(timeout, settings.RCON_TIMEOUT)
+
+        async def call(service: RCONService) -> Dict:
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(fn(service), timeout)
+                outcome = {"ok": True, "result": result}
+            except asyncio.TimeoutError:
+                outcome = {"ok": False, "error": f"Timeout tras {timeout:g}s"}
+            except RCONUnavailableError as e:
+                outcome = {"ok": False, "error": e.reason, "retry_after": round(e.retry_after, 1)}
+            except Exception as e:
+                outcome = {"ok": False, "error": str(e)}
+            outcome["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            return outcome
+
+        services = list(self._servers.values())
+        outcomes = await asyncio.gather(*(call(service) for service in services))
+        return {service.name: outcome for service, outcome in zip(services, outcomes)}
+
+    def close(self) -> None:
+        for service in self._servers.values():
+            service.close()
+
+
+server_registry = ServerRegistry(rcon_service, settings.minecraft_servers_list)
@@ -1,8 +1,9 @@
 import subprocess
-from typing import Literal, Dict
+from typing import Literal, Dict, Optional, Union
 from app.core.config import settings
 
-ServiceName = Literal["minecraft", "playit"]
+# Alias conocidos o el nombre de una unidad systemd (p.ej. "mc-survival.service")
+ServiceName = Union[Literal["minecraft", "playit"], str]
 
 
 class SystemdService:
@@ -12,6 +13,14 @@ class SystemdService:
         self.minecraft_service = settings.MINECRAFT_SERVICE
         self.playit_service = settings.PLAYIT_SERVICE
     
+    def _resolve(self, service: str) -> str:
+        """Traduce los alias "minecraft"/"playit"; cualquier otro nombre se usa como unidad"""
+        if service == "minecraft":
+            return self.minecraft_service
+        if service == "playit":
+            return self.playit_service
+        return service
+    
     def _run_systemctl(self, action: str, service: str) -> str:
         try:
             # Usamos la ruta completa /usr/bin/systemctl
@@ -39,7 +48,7 @@ class SystemdService:
     
     def start(self, service: ServiceName) -> Dict:
         """Inicia un servicio"""
-        service_name = self.minecraft_service if service == "minecraft" else self.playit_service
+        service_name = self._resolve(service)
         self._run_systemctl("start", service_name)
         return {
             "success": True, 
@@ -49,7 +58,7 @@ class SystemdService:
     
     def stop(self, service: ServiceName) -> Dict:
         """Detiene un servicio"""
-        service_name = self.minecraft_service if service == "minecraft" else self.playit_service
+        service_name = self._resolve(service)
         self._run_systemctl("stop", service_name)
         return {
             "success": True, 
@@ -59,7 +68,7 @@ class SystemdService:
     
     def restart(self, service: ServiceName) -> Dict:
         """Reinicia un servicio"""
-        service_name = self.minecraft_service if service == "minecraft" else self.playit_service
+        service_name = self._resolve(service)
         self._run_systemctl("restart", service_name)
         return {
             "success": True, 
@@ -69,7 +78,7 @@ class SystemdService:
     
     def status(self, service: ServiceName) -> Dict:
         """Obtiene estado de un servicio"""
-        service_name = self.minecraft_service if service == "minecraft" else self.playit_service
+        service_name = self._resolve(service)
         
         try:
             output = self._run_systemctl("is-active", service_name)
@@ -81,14 +90,27 @@ class SystemdService:
                 "state": output
             }
         except RuntimeError:
+            # systemctl no se pudo ejecutar: no sabemos si está parado
             return {
                 "service": service,
                 "active": False,
-                "state": "inactive"
+                "state": "unknown"
             }
     
+    def is_active(self, service: ServiceName) -> Optional[bool]:
+        """True/False según systemd, o None si no se pudo consultar"""
+        service_name = self._resolve(service)
+        try:
+            output = self._run_systemctl("is-active", service_name)
+        except RuntimeError:
+            return None
+        # Sin salida = systemctl no respondió (p.ej. sudo pidió contraseña)
+        if not output:
+            return None
+        return output == "active"
+    
     def get_logs(self, service: ServiceName, lines: int = 100) -> str:
-        service_name = self.minecraft_service if service == "minecraft" else self.playit_service
+        service_name = self._resolve(service)
         try:
             # Usamos la ruta completa /usr/bin/journalctl
             result = subprocess.run(
@@ -102,7 +124,7 @@ class SystemdService:
             raise RuntimeError(f"Error obteniendo logs: {e}")
     
     def get_uptime(self, service: ServiceName) -> int:
-        service_name = self.minecraft_service if service == "minecraft" else self.playit_service
+        service_name = self._resolve(service)
         try:
             # Usamos ActiveEnterTimestampMonotonic que devuelve microsegundos desde el boot
             # Es mucho más fiable que parsear fechas de texto
@@ -0,0 +1,256 @@
+"""
+Benchmark de consulta y exportación del registro de auditoría.
+
+Genera una tabla audit_log sintética (por defecto 3 millones de filas,
+un año de historia) en una BD aparte y mide:
+
+1. Paginación profunda: OFFSET frente a keyset (GET /audit con cursor)
+   a distintas profundidades.
+2. GET /audit con los filtros habituales (usuario, verbo, resultado,
+   rango temporal) y el plan de consulta que elige SQLite.
+3. GET /audit/export: filas/s y memoria del proceso mientras se genera
+   el NDJSON completo.
+
+La BD se puede reutilizar entre ejecuciones con --db (solo se genera si
+no existe). No toca data/admin.db.
+
+Uso:
+    python -m benchmarks.audit_query [--rows 3000000] [--db /tmp/audit-bench.db]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+import psutil
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.auth import TokenData, get_current_user
+from app.core.database import Base, get_async_db, make_async_engine, make_engine, resolve_url
+from app.core.pagination import encode_cursor
+from app.main import app
+from app.models.audit_log import AuditLog
+from app.routers import audit as audit_router
+
+YEAR = 365 * 86400
+USERS = [f"staff{i}" for i in range(40)] + ["admin", "console"]
+VERBS = ["say", "list", "kick", "ban", "pardon", "op", "whitelist", "tp", "give", "time", "weather", "gamemode"]
+VERB_WEIGHTS = [20, 25, 8, 3, 1, 1, 6, 12, 10, 6, 4, 4]
+
+# =====================
+# DATOS SINTÉTICOS
+# =====================
+
+def generate(path: str, rows: int, seed: int = 1) -> None:
+    rng = random.Random(seed)
+    engine = make_engine(resolve_url(f"sqlite:///{path}"), pragmas={"journal_mode": "WAL"})
+    Base.metadata.create_all(bind=engine, tables=[AuditLog.__table__])
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous=OFF")
+    # Los índices se crean al final: insertar con índices es varias veces más lento
+    for index in AuditLog.__table__.indexes:
+        conn.execute(f"DROP INDEX IF EXISTS {index.name}")
+
+    start = time.time() - YEAR
+    step = YEAR / rows
+    chunk = 100_000
+    for offset in range(0, rows, chunk):
+        batch = []
+        for i in range(offset, min(rows, offset + chunk)):
+            verb = rng.choices(VERBS, VERB_WEIGHTS)[0]
+            roll = rng.random()
+            outcome = "success" if roll < 0.9 else "error" if roll < 0.98 else "denied"
+            batch.append((
+                start + i * step + rng.random() * step,
+                rng.choice(USERS), "rcon", verb, "default", None,
+                f"{verb} player{rng.randrange(500)}", outcome, "ok", rng.uniform(0.2, 40.0),
+            ))
+        conn.executemany(
+            "INSERT INTO audit_log (created_at, username, action, verb, server, target, command, "
+            "outcome, result, latency_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+        conn.commit()
+        print(f"\r  {min(rows, offset + chunk):,} filas", end="", flush=True)
+    print()
+    for index in AuditLog.__table__.indexes:
+        columns = ", ".join(c.name for c in index.columns)
+        conn.execute(f"CREATE INDEX {index.name} ON audit_log ({columns})")
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+# =====================
+# MEDICIONES
+# =====================
+
+def timed(fn, repeat: int) -> float:
+    """Mediana en ms"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def timed_async(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def deep_pages(client: httpx.AsyncClient, conn: sqlite3.Connection, total: int, repeat: int) -> List[Tuple]:
+    rows = []
+    for depth in (0, 10_000, 100_000, 1_000_000, total - 200):
+        if depth < 0 or depth >= total:
+            continue
+        offset_sql = "SELECT * FROM audit_log ORDER BY created_at DESC, id DESC LIMIT 100 OFFSET ?"
+        offset_ms = timed(lambda: conn.execute(offset_sql, (depth,)).fetchall(), repeat)
+
+        # Cursor de la fila anterior a la profundidad pedida (no se mide)
+        created_at, row_id = conn.execute(
+            "SELECT created_at, id FROM audit_log ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET ?",
+            (max(depth - 1, 0),),
+        ).fetchone() if depth else (float("inf"), 0)
+        keyset_sql = (
+            "SELECT * FROM audit_log WHERE (created_at, id) < (?, ?) "
+            "ORDER BY created_at DESC, id DESC LIMIT 100"
+        )
+        keyset_ms = timed(lambda: conn.execute(keyset_sql, (created_at, row_id)).fetchall(), repeat)
+
+        params = {"limit": 100}
+        if depth:
+            params["cursor"] = encode_cursor(created_at, row_id)
+
+        async def endpoint() -> None:
+            r = await client.get("/audit", params=params)
+            assert r.status_code == 200, r.text
+
+        rows.append((depth, offset_ms, keyset_ms, await timed_async(endpoint, repeat)))
+    return rows
+
+
+def query_plan(conn: sqlite3.Connection, where: str, args: tuple) -> str:
+    sql = (
+        f"SELECT * FROM audit_log WHERE {where} AND (created_at, id) < (?, ?) "
+        "ORDER BY created_at DESC, id DESC LIMIT 101"
+    )
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", args + (time.time(), 1 << 62)).fetchall()
+    return "; ".join(row[-1] for row in plan)
+
+
+async def filtered(client: httpx.AsyncClient, conn: sqlite3.Connection, repeat: int) -> List[Tuple]:
+    day_start = time.time() - YEAR / 2
+    day_end = day_start + 86400
+    cases = [
+        ("usuario", {"username": "staff7"}, "username = ?", ("staff7",)),
+        ("verbo", {"verb": "ban"}, "verb = ?", ("ban",)),
+        ("resultado", {"outcome": "denied"}, "outcome = ?", ("denied",)),
+        ("rango de un día", {"since": day_start, "until": day_end},
+         "created_at >= ? AND created_at < ?", (day_start, day_end)),
+        ("usuario + verbo + día", {"username": "staff7", "verb": "kick", "since": day_start, "until": day_end},
+         "username = ? AND verb = ? AND created_at >= ? AND created_at < ?", ("staff7", "kick", day_start, day_end)),
+    ]
+    rows = []
+    for name, params, where, args in cases:
+        params = {**params, "limit": 100}
+
+        async def first_page() -> None:
+            r = await client.get("/audit", params=params)
+            assert r.status_code == 200, r.text
+
+        ms = await timed_async(first_page, repeat)
+        rows.append((name, ms, query_plan(conn, where, args)))
+    return rows
+
+
+async def export(filters: audit_router.AuditFilters, total: int) -> Dict:
+    """Consume el generador de /audit/export; RSS al 10 % y máximo al final"""
+    process = psutil.Process()
+    rss_start = peak = process.memory_info().rss
+    rss_10 = 0
+    written = lines = 0
+    started = time.perf_counter()
+    async for chunk in audit_router._ndjson(filters):
+        written += len(chunk)
+        lines += chunk.count("\n")
+        rss = process.memory_info().rss
+        peak = max(peak, rss)
+        if not rss_10 and lines >= total // 10:
+            rss_10 = peak
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": lines,
+        "mb": written / 1e6,
+        "rows_per_second": lines / elapsed,
+        "rss_start_mb": rss_start / 1e6,
+        "rss_10_mb": rss_10 / 1e6,
+        "rss_peak_mb": peak / 1e6,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="audit-bench-"), "audit.db")
+    if not os.path.exists(path):
+        print(f"Generando {args.rows:,} filas en {path}")
+        generate(path, args.rows)
+    conn = sqlite3.connect(path)
+    total = conn.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0]
+    print(f"audit_log: {total:,} filas ({os.path.getsize(path) / 1e6:,.0f} MB)")
+
+    engine = make_async_engine(resolve_url(f"sqlite:///{path}"))
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override_async_db():
+        async with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_async_db
+    app.dependency_overrides[get_current_user] = lambda: TokenData("bench", "admin")
+    # La exportación abre sus propias sesiones
+    audit_router.AsyncSessionLocal = factory
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"\nPaginación profunda (100 filas, mediana de {args.repeat})")
+        print(f"{'profundidad':>12} {'SQL OFFSET':>12} {'SQL keyset':>12} {'GET /audit':>12}")
+        for depth, offset_ms, keyset_ms, endpoint_ms in await deep_pages(client, conn, total, args.repeat):
+            print(f"{depth:>12,} {offset_ms:>10.2f}ms {keyset_ms:>10.2f}ms {endpoint_ms:>10.2f}ms")
+
+        print(f"\nFiltros (primera página, mediana de {args.repeat})")
+        for name, ms, plan in await filtered(client, conn, args.repeat):
+            print(f"  {name:<24} {ms:>8.2f}ms  {plan}")
+
+    filters = audit_router.AuditFilters(
+        username=None, verb=None, outcome=None, since=None, until=None
+    )
+    row = await export(filters, total)
+    print(
+        f"\nExportación NDJSON: {row['rows']:,} filas, {row['mb']:,.0f} MB, {row['rows_per_second']:,.0f} filas/s"
+        f"\n  RSS: inicio {row['rss_start_mb']:.0f} MB, al 10 % {row['rss_10_mb']:.0f} MB, "
+        f"máximo {row['rss_peak_mb']:.0f} MB (incluye páginas de mmap y caché de SQLite)"
+    )
+
+    await engine.dispose()
+    app.dependency_overrides.clear()
+    conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de consulta y exportación de auditoría")
+    parser.add_argument("--rows", type=int, default=3_000_000, help="filas sintéticas a generar")
+    parser.add_argument("--db", default="", help="ruta de la BD sintética (se reutiliza si existe)")
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
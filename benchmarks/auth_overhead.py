@@ -0,0 +1,120 @@
+"""
+Microbenchmark del coste de get_current_user por petición.
+
+Llama a la dependencia directamente (sin HTTP) en modo stateless, para
+medir solo la verificación del token: con la caché de tokens
+decodificados y sin ella (jwt.decode + HMAC en cada llamada), con un
+token válido y con uno de firma incorrecta (caché negativa).
+
+Antes comprueba que RevocationList.purge borra las filas caducadas de
+token_revocations sin que los workers pierdan las siguientes.
+
+Uso:
+    python -m benchmarks.auth_overhead [--iterations 20000]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core import auth
+from app.core.auth import create_access_token, get_current_user
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import Base, make_async_engine, resolve_url
+from app.core.revocation import RevocationList, revocation_list
+from app.models.token_revocation import TokenRevocation
+
+
+async def per_call_us(fn: Callable[[], Awaitable[None]], iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def accepted(token: str) -> Callable[[], Awaitable[None]]:
+    async def call() -> None:
+        await get_current_user(token)
+    return call
+
+
+def rejected(token: str) -> Callable[[], Awaitable[None]]:
+    async def call() -> None:
+        try:
+            await get_current_user(token)
+        except HTTPException:
+            return
+        raise AssertionError("el token debería rechazarse")
+    return call
+
+
+async def check_purge() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_async_engine(resolve_url(f"sqlite:///{Path(tmp) / 'revocations.db'}"))
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        try:
+            now = time.time()
+            async with factory() as db:
+                db.add_all(
+                    [TokenRevocation(jti=f"viejo{i}", expires_at=now - 60) for i in range(100)]
+                    + [TokenRevocation(jti="vigente", expires_at=now + 60)]
+                    + [TokenRevocation(username="cambiado", expires_at=now - 1)]
+                )
+                await db.commit()
+
+                worker = RevocationList()
+                await worker.load(db)
+                # Todas caducadas salvo "vigente"; la de id máximo se conserva
+                assert await worker.purge(db) == 100
+                count = await db.scalar(select(func.count()).select_from(TokenRevocation))
+                assert count == 2, count
+
+                # La siguiente fila no reutiliza un id ya leído por el worker
+                await RevocationList().revoke_token(db, "nuevo", now + 60)
+                assert await worker.load(db) == 1
+                assert worker.is_revoked("bench", "nuevo", None)
+                assert worker.is_revoked("bench", "vigente", None)
+        finally:
+            await engine.dispose()
+    print("purga de token_revocations: ok")
+
+
+async def main(args: argparse.Namespace) -> None:
+    await check_purge()
+
+    # Se mide la verificación del token, no la BD ni el refresco de revocaciones
+    settings.AUTH_MODE = "stateless"
+    revocation_list.refresh_interval = revocation_list._next_refresh = float("inf")
+
+    token = create_access_token({"sub": "bench", "roles": "admin"})
+    forged = token[:-4] + ("AAAA" if not token.endswith("AAAA") else "BBBB")
+    cached = (auth.token_cache, auth.rejected_tokens)
+    disabled = (TTLCache(maxsize=0), TTLCache(maxsize=0))
+
+    print(f"{'caso':<32} {'µs/llamada':>12} {'llamadas/s':>12}")
+    for label, (positive, negative) in (("sin caché", disabled), ("con caché", cached)):
+        auth.token_cache, auth.rejected_tokens = positive, negative
+        for case, fn in (
+            ("token válido", accepted(token)),
+            ("firma incorrecta", rejected(forged)),
+        ):
+            await fn()  # calienta la caché si está activa
+            us = await per_call_us(fn, args.iterations)
+            print(f"{case + ' (' + label + ')':<32} {us:>12.2f} {1e6 / us:>12,.0f}")
+
+    auth.token_cache, auth.rejected_tokens = cached
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coste por petición de get_current_user")
+    parser.add_argument("--iterations", type=int, default=20000)
+    asyncio.run(main(parser.parse_args()))
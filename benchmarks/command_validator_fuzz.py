@@ -0,0 +1,211 @@
+"""
+Fuzzing y regresión de rendimiento de validate_command.
+
+1. Equivalencia: genera comandos aleatorios y casi válidos (mutaciones de
+   comandos reales: cambios de mayúsculas, caracteres Unicode equivalentes
+   bajo IGNORECASE, espacios/tabuladores/saltos de línea, argumentos
+   truncados o extra) y compara el matcher compilado con la semántica de
+   referencia: `re.match(patrón, comando.strip(), re.IGNORECASE)` sobre la
+   lista de patrones del rol.
+2. Rendimiento: validaciones/s y latencia máxima por llamada.
+3. Backtracking: sondas de longitud creciente contra patrones como
+   `^kick \\w+.*`; si el tiempo crece de forma superlineal se marca.
+
+Sale con código 1 si hay discrepancias, si el throughput baja de
+--min-rate o si alguna sonda supera --max-probe-ms o crece de forma
+superlineal, así que sirve como comprobación antes de desplegar un matcher
+nuevo.
+
+Uso:
+    python -m benchmarks.command_validator_fuzz [--cases 1000000] [--seed 1]
+"""
+import argparse
+import random
+import re
+import string
+import time
+from typing import Dict, Iterator, List, Pattern, Tuple
+
+from app.core.command_validator import command_policy, validate_command, ROLE_GRANTS
+from app.core.roles import ROLE_ADMIN, ROLE_OPERATOR, ROLE_VIEWER
+from benchmarks.command_validator import CORPUS
+
+MASKS = (ROLE_VIEWER, ROLE_OPERATOR, ROLE_ADMIN, ROLE_ADMIN | ROLE_OPERATOR, 0)
+
+# Caracteres que IGNORECASE considera equivalentes a letras ASCII
+UNICODE_TWINS = {"s": "ſ", "k": "K", "i": "İ", "a": "ª", "o": "º"}
+NOISE = string.ascii_letters + string.digits + " _-.:@~\t\n §é"
+ARGUMENTS = ["steve", "0", "64", "-1", "@a", "diamond", "day", "rain", "survival", "10.0.0.1", ""]
+
+
+def reference_patterns(role_mask: int) -> List[Pattern]:
+    """Patrones de la política vigente en el orden original, uno a uno"""
+    allowed = command_policy.current().allowed
+    for bit, groups in ROLE_GRANTS.items():
+        if role_mask & bit:
+            return [re.compile(p, re.IGNORECASE) for g in groups for p in allowed.get(g, [])]
+    return []
+
+
+def reference_validate(patterns: List[Pattern], command: str) -> bool:
+    command = command.strip()
+    return any(p.match(command) for p in patterns)
+
+
+# =====================
+# GENERADORES
+# =====================
+
+def mutate(rng: random.Random, command: str) -> str:
+    op = rng.randrange(9)
+    if not command:
+        return rng.choice(NOISE)
+    i = rng.randrange(len(command))
+    if op == 0:
+        # Insertar un carácter
+        return command[:i] + rng.choice(NOISE) + command[i:]
+    if op == 1:
+        # Borrar un carácter
+        return command[:i] + command[i + 1:]
+    if op == 2:
+        # Sustituir un carácter
+        return command[:i] + rng.choice(NOISE) + command[i + 1:]
+    if op == 3:
+        return "".join(c.upper() if rng.random() < 0.5 else c for c in command)
+    if op == 4:
+        twins = [j for j, c in enumerate(command) if c.lower() in UNICODE_TWINS]
+        if twins:
+            j = rng.choice(twins)
+            return command[:j] + UNICODE_TWINS[command[j].lower()] + command[j + 1:]
+        return command
+    if op == 5:
+        # Espacios alrededor o entre tokens
+        ws = rng.choice([" ", "  ", "\t", "\n", "\r\n", " "])
+        return rng.choice([ws + command, command + ws, command.replace(" ", ws, 1)])
+    if op == 6:
+        return command + " " + rng.choice(ARGUMENTS)
+    if op == 7:
+        return command.rsplit(" ", 1)[0]
+    return command + "\n" + rng.choice(CORPUS)
+
+
+def random_command(rng: random.Random) -> str:
+    if rng.random() < 0.1:
+        return "".join(rng.choice(NOISE) for _ in range(rng.randrange(1, 40)))
+    command = rng.choice(CORPUS)
+    for _ in range(rng.randrange(1, 4)):
+        command = mutate(rng, command)
+    return command
+
+
+def generate(rng: random.Random, cases: int) -> Iterator[Tuple[str, int]]:
+    for _ in range(cases):
+        yield random_command(rng), rng.choice(MASKS)
+
+# =====================
+# FASES
+# =====================
+
+def check_equivalence(rng: random.Random, cases: int) -> List[Tuple[str, int, bool]]:
+    patterns: Dict[int, List[Pattern]] = {mask: reference_patterns(mask) for mask in MASKS}
+    mismatches = []
+    for command, mask in generate(rng, cases):
+        expected = reference_validate(patterns[mask], command)
+        if validate_command(command, mask) != expected:
+            mismatches.append((command, mask, expected))
+    return mismatches
+
+
+def measure_throughput(rng: random.Random, cases: int) -> Tuple[float, float, str]:
+    workload = list(generate(rng, cases))
+    worst, worst_command = 0.0, ""
+    started = time.perf_counter()
+    for command, mask in workload:
+        t = time.perf_counter()
+        validate_command(command, mask)
+        elapsed = time.perf_counter() - t
+        if elapsed > worst:
+            worst, worst_command = elapsed, command
+    total = time.perf_counter() - started
+    return len(workload) / total, worst, worst_command
+
+
+# Sondas que fuerzan el máximo trabajo en los patrones con .* / \w+ / \d+
+PROBES = {
+    "kick \\w+.*": lambda n: "kick " + "a" * n + "!",
+    "ban \\w+.*": lambda n: "ban " + "a" * n + " " + "b " * n,
+    "say .+": lambda n: "say " + " " * n + "\n",
+    "msg \\w+ .+": lambda n: "msg " + "a" * n,
+    "tp \\w+ \\d+ \\d+ \\d+": lambda n: "tp a " + "1" * n + " 1",
+    "fill \\d+ ...": lambda n: "fill " + "1 " * n,
+    "verbo desconocido": lambda n: "x" * n,
+}
+PROBE_SIZES = (1_000, 4_000, 16_000, 64_000)
+
+
+def run_probes(repeat: int) -> List[Dict]:
+    rows = []
+    for name, build in PROBES.items():
+        timings = []
+        for size in PROBE_SIZES:
+            command = build(size)
+            best = min(_time_call(command) for _ in range(repeat))
+            timings.append(best)
+        # Crecimiento entre tamaños consecutivos (x4 de entrada)
+        growth = max(b / a for a, b in zip(timings, timings[1:]) if a > 0) if len(timings) > 1 else 0
+        rows.append({"probe": name, "timings": timings, "growth": growth})
+    return rows
+
+
+def _time_call(command: str) -> float:
+    started = time.perf_counter()
+    validate_command(command, ROLE_ADMIN)
+    return time.perf_counter() - started
+
+
+def main(args: argparse.Namespace) -> int:
+    failed = False
+
+    started = time.perf_counter()
+    mismatches = check_equivalence(random.Random(args.seed), args.cases)
+    print(f"Equivalencia: {args.cases:,} casos en {time.perf_counter() - started:.1f}s, "
+          f"{len(mismatches)} discrepancias")
+    for command, mask, expected in mismatches[:20]:
+        print(f"  mask={mask} esperado={expected} comando={command!r}")
+    failed |= bool(mismatches)
+
+    rate, worst, worst_command = measure_throughput(random.Random(args.seed + 1), args.throughput_cases)
+    print(f"\nThroughput: {rate:,.0f} validaciones/s, peor llamada {worst * 1e6:.1f} µs "
+          f"({worst_command[:40]!r})")
+    if rate < args.min_rate:
+        print(f"  REGRESIÓN: por debajo de {args.min_rate:,.0f} validaciones/s")
+        failed = True
+
+    print(f"\nSondas de backtracking (admin), mejor de {args.repeat}:")
+    header = "".join(f"{size:>12,}" for size in PROBE_SIZES)
+    print(f"{'sonda':<20}{header}{'crecimiento':>13}")
+    for row in run_probes(args.repeat):
+        cells = "".join(f"{t * 1000:>10.3f}ms" for t in row["timings"])
+        flags = []
+        # Entrada x4: lineal ~x4, cuadrático ~x16
+        if row["growth"] > args.max_growth and row["timings"][-1] > 0.001:
+            flags.append("SUPERLINEAL")
+        if row["timings"][-1] * 1000 > args.max_probe_ms:
+            flags.append("LENTA")
+        print(f"{row['probe']:<20}{cells}{row['growth']:>12.1f}x {' '.join(flags)}")
+        failed |= bool(flags)
+
+    print("\nRESULTADO:", "FALLO" if failed else "OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fuzzing y regresión de rendimiento del validador")
+    parser.add_argument("--cases", type=int, default=1_000_000, help="casos de equivalencia")
+    parser.add_argument("--throughput-cases", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5, help="repeticiones por sonda")
+    parser.add_argument("--min-rate", type=float, default=100_000, help="validaciones/s mínimas")
+    parser.add_argument("--max-probe-ms", type=float, default=50.0, help="tiempo máximo por sonda")
+    parser.add_argument("--max-growth", type=float, default=8.0, help="crecimiento máximo con entrada x4")
+    raise SystemExit(main(parser.parse_args()))
@@ -0,0 +1,126 @@
+"""
+Benchmark de transacciones concurrentes de lectura/escritura en SQLite.
+
+Simula N workers de uvicorn (procesos) con el motor aiosqlite de la app,
+cada uno con C tareas que mezclan lecturas (usuario por username, como
+get_current_user en fallo de caché) y escrituras (fila en
+token_revocations, como logout). Compara los valores por defecto de
+SQLite (journal DELETE, synchronous FULL) con el perfil configurado en
+settings (WAL, synchronous NORMAL, busy_timeout, mmap, caché).
+
+Usa una BD temporal, no toca data/admin.db.
+
+Uso:
+    python -m benchmarks.db_concurrency [--workers 4] [--tasks 8] [--seconds 5] [--write-ratio 0.2]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.database import Base, make_async_engine, make_engine, resolve_url, sqlite_pragmas
+from app.models.token_revocation import TokenRevocation
+from app.models.user import User
+from benchmarks.rcon_throughput import percentile
+
+USERS = 1000
+
+# Valores por defecto de SQLite; busy_timeout = timeout por defecto de sqlite3 (5 s)
+DEFAULT_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL", "busy_timeout": 5000}
+
+
+def setup_database(path: Path) -> None:
+    engine = make_engine(resolve_url(f"sqlite:///{path}"), pragmas={})
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(
+            User.__table__.insert(),
+            [{"username": f"user{i}", "password_hash": "x", "roles": "viewer"} for i in range(USERS)],
+        )
+    engine.dispose()
+
+
+async def run_worker(path: str, pragmas: Dict[str, Any], tasks: int, seconds: float, write_ratio: float, seed: int) -> Dict:
+    engine = make_async_engine(resolve_url(f"sqlite:///{path}"), pragmas=pragmas)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    reads: List[float] = []
+    writes: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def task(rng: random.Random) -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            is_write = rng.random() < write_ratio
+            started = time.perf_counter()
+            try:
+                async with factory() as db:
+                    if is_write:
+                        db.add(TokenRevocation(jti=f"{rng.getrandbits(64):x}", expires_at=time.time() + 900))
+                        await db.commit()
+                    else:
+                        username = f"user{rng.randrange(USERS)}"
+                        result = await db.execute(select(User).where(User.username == username))
+                        result.scalar_one()
+            except OperationalError:
+                # "database is locked": se agotó busy_timeout esperando al escritor
+                errors += 1
+                continue
+            (writes if is_write else reads).append(time.perf_counter() - started)
+
+    await asyncio.gather(*(task(random.Random(seed * 1000 + i)) for i in range(tasks)))
+    await engine.dispose()
+    return {"reads": reads, "writes": writes, "errors": errors}
+
+
+def worker_process(args: tuple) -> Dict:
+    return asyncio.run(run_worker(*args))
+
+
+def run_profile(pragmas: Dict[str, Any], args: argparse.Namespace) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        setup_database(path)
+        jobs = [(str(path), pragmas, args.tasks, args.seconds, args.write_ratio, i) for i in range(args.workers)]
+        started = time.perf_counter()
+        with multiprocessing.Pool(args.workers) as pool:
+            results = pool.map(worker_process, jobs)
+        elapsed = time.perf_counter() - started
+
+    reads = sorted(t for r in results for t in r["reads"])
+    writes = sorted(t for r in results for t in r["writes"])
+    return {
+        "tx_per_second": (len(reads) + len(writes)) / elapsed,
+        "read_p99_ms": percentile(reads, 0.99) * 1000 if reads else 0.0,
+        "write_p50_ms": percentile(writes, 0.50) * 1000 if writes else 0.0,
+        "write_p99_ms": percentile(writes, 0.99) * 1000 if writes else 0.0,
+        "errors": sum(r["errors"] for r in results),
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    print(f"{args.workers} workers x {args.tasks} tareas, {args.seconds:g}s, {args.write_ratio:.0%} escrituras")
+    print(f"\n{'perfil':<22} {'tx/s':>10} {'lect. p99':>11} {'escr. p50':>11} {'escr. p99':>11} {'errores':>8}")
+    for name, pragmas in (("por defecto", DEFAULT_PRAGMAS), ("configurado", sqlite_pragmas())):
+        row = run_profile(pragmas, args)
+        print(
+            f"{name:<22} {row['tx_per_second']:>10,.0f} {row['read_p99_ms']:>9.2f}ms "
+            f"{row['write_p50_ms']:>9.2f}ms {row['write_p99_ms']:>9.2f}ms {row['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de lectura/escritura concurrente en SQLite")
+    parser.add_argument("--workers", type=int, default=4, help="procesos, como uvicorn --workers")
+    parser.add_argument("--tasks", type=int, default=8, help="peticiones concurrentes por worker")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    main(parser.parse_args())
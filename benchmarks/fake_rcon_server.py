@@ -0,0 +1,257 @@
+"""
+Servidor Source RCON falso para desarrollo y benchmarks locales.
+
+Imita el comportamiento de Minecraft:
+- una sola lectura de hasta 1460 bytes por paquete: si no contiene
+  exactamente un paquete completo, se cierra la conexión (un cliente que
+  escriba dos paquetes seguidos sin esperar respuesta se desconecta)
+- login con contraseña (id -1 si es incorrecta)
+- respuestas fragmentadas en payloads de 4096 bytes
+- "Unknown request 0" al paquete centinela SERVERDATA_RESPONSE_VALUE
+- los comandos se procesan de uno en uno, como en el hilo principal del
+  servidor, con una latencia configurable que simula el tick
+- estado simulado para list, whitelist, ban/pardon, kick y banlist
+
+Uso como servidor independiente:
+    python -m benchmarks.fake_rcon_server --port 25575 --password test --latency-ms 5
+"""
+import argparse
+import asyncio
+import random
+import struct
+from typing import Callable, Dict, List, Optional, Set, Union
+
+from app.core.rcon_protocol import (
+    SERVERDATA_AUTH,
+    SERVERDATA_AUTH_RESPONSE,
+    SERVERDATA_EXECCOMMAND,
+    SERVERDATA_RESPONSE_VALUE,
+    encode_packet,
+)
+
+FRAGMENT_SIZE = 4096
+# Tamaño del buffer de lectura de RconClient en Minecraft
+READ_SIZE = 1460
+_SIZE = struct.Struct("<i")
+_ID_TYPE = struct.Struct("<ii")
+
+Script = Union[str, Callable[[str], str]]
+
+
+class FakeRCONServer:
+    def __init__(
+        self,
+        password: str = "test",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        serialize: bool = True,
+        players: int = 0,
+        max_players: int = 20,
+        scripts: Optional[Dict[str, Script]] = None,
+    ):
+        """
+        Args:
+            latency: segundos que tarda cada comando (simula el tick)
+            jitter: variación aleatoria máxima añadida a la latencia
+            serialize: procesar un comando a la vez en todo el servidor
+            players: jugadores conectados simulados al arrancar
+            scripts: respuestas fijas por comando exacto (texto o función)
+        """
+        self.password = password
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.serialize = serialize
+        self.max_players = max_players
+        self.scripts: Dict[str, Script] = scripts or {}
+
+        self.online: List[str] = [f"player{i}" for i in range(players)]
+        self.whitelist: Set[str] = set()
+        self.banned: Dict[str, str] = {}
+
+        self.commands_received = 0
+        self.logins = 0
+        self.framing_errors = 0  # conexiones cerradas por lecturas que no son un paquete
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tick_lock = asyncio.Lock()
+        self._handlers: Set[asyncio.Task] = set()
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    # ---------------------
+    # COMANDOS SIMULADOS
+    # ---------------------
+
+    def reply(self, command: str) -> str:
+        script = self.scripts.get(command)
+        if script is not None:
+            return script(command) if callable(script) else script
+
+        args = command.split()
+        verb = args[0].lower() if args else ""
+
+        if verb == "list":
+            names = ", ".join(self.online)
+            return f"There are {len(self.online)} of a max of {self.max_players} players online: {names}"
+        if verb == "big" and len(args) > 1:
+            # Respuesta de N bytes para probar la fragmentación
+            return "x" * int(args[1])
+        if verb == "say":
+            return ""
+        if verb == "whitelist" and len(args) > 1:
+            return self._whitelist(args[1:])
+        if verb == "kick" and len(args) > 1:
+            if args[1] not in self.online:
+                return "No player was found"
+            self.online.remove(args[1])
+            return f"Kicked {args[1]}: {' '.join(args[2:]) or 'Kicked by an operator'}"
+        if verb == "ban" and len(args) > 1:
+            reason = " ".join(args[2:]) or "Banned by an operator"
+            self.banned[args[1]] = reason
+            if args[1] in self.online:
+                self.online.remove(args[1])
+            return f"Banned {args[1]}: {reason}"
+        if verb == "pardon" and len(args) > 1:
+            if self.banned.pop(args[1], None) is None:
+                return "Nothing changed. The player isn't banned"
+            return f"Unbanned {args[1]}"
+        if verb == "banlist":
+            if not self.banned:
+                return "There are no bans"
+            lines = [f"{name} was banned by Rcon: {reason}" for name, reason in self.banned.items()]
+            return f"There are {len(lines)} ban(s):" + "".join(lines)
+        return f"Unknown or incomplete command, see below for error{command}<--[HERE]"
+
+    def _whitelist(self, args: List[str]) -> str:
+        action = args[0].lower()
+        if action == "add" and len(args) > 1:
+            if args[1] in self.whitelist:
+                return "Player is already whitelisted"
+            self.whitelist.add(args[1])
+            return f"Added {args[1]} to the whitelist"
+        if action == "remove" and len(args) > 1:
+            if args[1] not in self.whitelist:
+                return "Player is not whitelisted"
+            self.whitelist.discard(args[1])
+            return f"Removed {args[1]} from the whitelist"
+        if action == "list":
+            if not self.whitelist:
+                return "There are no whitelisted players"
+            names = ", ".join(sorted(self.whitelist))
+            return f"There are {len(self.whitelist)} whitelisted players: {names}"
+        return f"Whitelist {action}"
+
+    async def _execute(self, command: str) -> bytes:
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if self.serialize:
+            async with self._tick_lock:
+                if delay:
+                    await asyncio.sleep(delay)
+                return self.reply(command).encode()
+        if delay:
+            await asyncio.sleep(delay)
+        return self.reply(command).encode()
+
+    # ---------------------
+    # PROTOCOLO
+    # ---------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        authenticated = False
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        self._writers.add(writer)
+        try:
+            while True:
+                # Como RconClient: una lectura por paquete, sin reensamblar
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                # size + id + type + 2 nulos: un paquete vacío ocupa 14 bytes
+                if len(data) < 14 or _SIZE.unpack_from(data)[0] != len(data) - 4:
+                    self.framing_errors += 1
+                    break
+                body = data[4:]
+                request_id, packet_type = _ID_TYPE.unpack_from(body)
+                payload = body[8:-2]
+
+                if packet_type == SERVERDATA_AUTH:
+                    authenticated = payload.decode() == self.password
+                    if authenticated:
+                        self.logins += 1
+                    writer.write(encode_packet(
+                        request_id if authenticated else -1, SERVERDATA_AUTH_RESPONSE
+                    ))
+                elif not authenticated:
+                    break
+                elif packet_type == SERVERDATA_EXECCOMMAND:
+                    self.commands_received += 1
+                    data = await self._execute(payload.decode())
+                    for start in range(0, max(len(data), 1), FRAGMENT_SIZE):
+                        writer.write(encode_packet(
+                            request_id,
+                            SERVERDATA_RESPONSE_VALUE,
+                            data[start:start + FRAGMENT_SIZE],
+                        ))
+                else:
+                    writer.write(encode_packet(
+                        request_id, SERVERDATA_RESPONSE_VALUE, b"Unknown request 0"
+                    ))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            self._handlers.discard(task)
+            writer.close()
+
+    async def start(self) -> "FakeRCONServer":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    def drop_connections(self) -> None:
+        """Cierra las conexiones abiertas, como al reiniciar el servidor"""
+        for writer in list(self._writers):
+            writer.transport.abort()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Cerrar los sockets hace que cada handler termine limpiamente
+            self.drop_connections()
+            if self._handlers:
+                await asyncio.wait(list(self._handlers))
+            await self._server.wait_closed()
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = await FakeRCONServer(
+        password=args.password,
+        host=args.host,
+        port=args.port,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        players=args.players,
+    ).start()
+    print(f"RCON falso escuchando en {server.host}:{server.port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor RCON falso")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=25575)
+    parser.add_argument("--password", default="test")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--players", type=int, default=5)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,164 @@
+"""
+Benchmark de un pico de logins y su efecto en el resto de la API.
+
+Compara el login síncrono original (verificación pbkdf2 en el threadpool)
+con /auth/login actual (verificación en el pool de procesos de hashing).
+Mientras dura el pico, una sonda llama en bucle a una ruta síncrona
+barata (/minecraft/commands/allowed) y se miden sus latencias.
+
+Usa una base de datos SQLite en memoria, no toca data/admin.db.
+
+Uso:
+    python -m benchmarks.login_burst [--logins 200] [--concurrency 32] [--workers 2]
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+import httpx
+from fastapi import Depends, HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import hashing
+from app.core.auth import TokenData, authenticate_user, get_current_user
+from app.core.database import Base, get_async_db, get_db
+from app.core.rate_limit import login_guard
+from app.main import app
+from app.models.user import User
+from app.routers.auth import LoginRequest
+from benchmarks.rcon_throughput import percentile
+
+USERNAME, PASSWORD = "bench", "bench-password"
+
+
+async def setup_database() -> None:
+    """Dos BD en memoria con el mismo usuario: síncrona (login original) y aiosqlite"""
+    password_hash = hashing.hash_password(PASSWORD)
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    with factory() as db:
+        db.add(User(username=USERNAME, password_hash=password_hash, roles="admin"))
+        db.commit()
+
+    async_engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+    async with async_factory() as db:
+        db.add(User(username=USERNAME, password_hash=password_hash, roles="admin"))
+        await db.commit()
+
+    def override_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_async_db():
+        async with async_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_async_db] = override_async_db
+    app.dependency_overrides[get_current_user] = lambda: TokenData("bench", "admin")
+
+
+def legacy_login(login_data: LoginRequest, db: Session = Depends(get_db)):
+    """Login original: ruta síncrona que verifica en el threadpool"""
+    if not authenticate_user(db, login_data.username, login_data.password):
+        raise HTTPException(status_code=401)
+    return {"ok": True}
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, latencies: List[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        r = await client.get("/minecraft/commands/allowed")
+        assert r.status_code == 200, r.text
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.005)
+
+
+async def burst(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> Dict:
+    counter = iter(range(total))
+    login = {"username": USERNAME, "password": PASSWORD}
+
+    async def worker() -> None:
+        for _ in counter:
+            r = await client.post(path, json=login)
+            assert r.status_code == 200, r.text
+
+    stop = asyncio.Event()
+    latencies: List[float] = []
+    prober = asyncio.ensure_future(probe(client, stop, latencies))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await prober
+
+    latencies.sort()
+    return {
+        "logins_per_second": total / elapsed,
+        "probe_requests": len(latencies),
+        "probe_p50_ms": percentile(latencies, 0.50) * 1000,
+        "probe_p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def idle_probe(client: httpx.AsyncClient, seconds: float = 1.0) -> float:
+    stop = asyncio.Event()
+    latencies: List[float] = []
+    prober = asyncio.ensure_future(probe(client, stop, latencies))
+    await asyncio.sleep(seconds)
+    stop.set()
+    await prober
+    latencies.sort()
+    return percentile(latencies, 0.99) * 1000
+
+
+async def main(args: argparse.Namespace) -> None:
+    await setup_database()
+    app.add_api_route("/bench/login-sync", legacy_login, methods=["POST"])
+    # Los intentos cuentan antes de verificar: con `concurrency` logins en
+    # curso del mismo usuario e IP, el guard respondería 429 sin ampliar límites
+    login_guard.users.limit = login_guard.ips.limit = args.concurrency + 1
+    hashing.start(args.workers)
+    # Calienta el pool: la primera llamada paga el arranque de los procesos
+    await hashing.verify_password_async(PASSWORD, hashing.hash_password(PASSWORD))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"Sonda sin carga: p99 {await idle_probe(client):.2f} ms")
+        print(f"\n{'login':<28} {'logins/s':>10} {'sonda p50':>11} {'sonda p99':>11} {'sondas':>8}")
+        for name, path in (
+            ("síncrono (threadpool)", "/bench/login-sync"),
+            (f"async (pool {args.workers} procesos)", "/auth/login"),
+        ):
+            row = await burst(client, path, args.logins, args.concurrency)
+            print(
+                f"{name:<28} {row['logins_per_second']:>10,.1f} {row['probe_p50_ms']:>9.2f}ms "
+                f"{row['probe_p99_ms']:>9.2f}ms {row['probe_requests']:>8}"
+            )
+
+    hashing.shutdown()
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de pico de logins")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=2, help="procesos del pool de hashing")
+    asyncio.run(main(parser.parse_args()))
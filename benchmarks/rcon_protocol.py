@@ -0,0 +1,143 @@
+"""
+Microbenchmarks del motor RCON asíncrono contra un servidor falso local.
+
+Uso:
+    python -m benchmarks.rcon_protocol [--commands 5000]
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.rcon_protocol import (
+    SERVERDATA_EXECCOMMAND,
+    SERVERDATA_RESPONSE_VALUE,
+    AsyncRCONClient,
+    RCONClientProtocol,
+    RCONNotSentError,
+    encode_packet,
+)
+from app.services.rcon_pool import RCONPool
+from benchmarks.fake_rcon_server import FakeRCONServer
+
+
+class _NullTransport:
+    def write(self, data) -> None:
+        pass
+
+
+def bench_encode(n: int) -> float:
+    payload = b"whitelist add jugador"
+    start = time.perf_counter()
+    for i in range(n):
+        encode_packet(i, SERVERDATA_EXECCOMMAND, payload)
+    return n / (time.perf_counter() - start)
+
+
+def bench_decode(n: int) -> float:
+    """Paquetes/s procesados por data_received, en lotes de 64 paquetes"""
+    loop = asyncio.new_event_loop()
+    try:
+        protocol = RCONClientProtocol()
+        protocol.connection_made(_NullTransport())
+        chunk = b"".join(
+            bytes(encode_packet(i, SERVERDATA_RESPONSE_VALUE, b"There are 3 of a max of 20 players online"))
+            for i in range(64)
+        )
+        batches = n // 64
+        start = time.perf_counter()
+        for _ in range(batches):
+            protocol.data_received(chunk)
+        return batches * 64 / (time.perf_counter() - start)
+    finally:
+        loop.close()
+
+
+async def bench_roundtrip(server: FakeRCONServer, n: int) -> dict:
+    client = AsyncRCONClient(server.host, server.port, server.password)
+    await client.connect()
+    try:
+        start = time.perf_counter()
+        for i in range(n // 10):
+            await client.run(f"say {i}")
+        sequential = (n // 10) / (time.perf_counter() - start)
+
+        # Concurrentes sobre una conexión: esperan turno, un comando pendiente a la vez
+        start = time.perf_counter()
+        await asyncio.gather(*(client.run(f"say {i}") for i in range(n)))
+        concurrent = n / (time.perf_counter() - start)
+        assert server.framing_errors == 0, "El servidor recibió varios paquetes en una lectura"
+
+        big = await client.run("big 50000")
+        assert len(big) == 50000, f"Respuesta multipaquete incompleta: {len(big)} bytes"
+    finally:
+        client.close()
+
+    return {"sequential": sequential, "concurrent": concurrent}
+
+
+async def check_cancelled_command() -> None:
+    """
+    Un comando cancelado tras escribirse inutiliza su conexión: el siguiente
+    no se escribe en ella (la respuesta tardía se mezclaría con la suya) y
+    el pool lo reintenta en otra conexión sin que el servidor corte nada.
+    """
+    server = await FakeRCONServer(latency=0.2).start()
+    pool = RCONPool(server.host, server.port, server.password, size=1)
+    try:
+        client = await pool.acquire()
+        slow = asyncio.create_task(client.run("say lento"))
+        await asyncio.sleep(0.05)
+        slow.cancel()
+        try:
+            await slow
+        except asyncio.CancelledError:
+            pass
+        assert not client.is_alive, "La conexión del comando cancelado sigue en uso"
+        try:
+            await client.run("say rapido")
+            raise AssertionError("Se escribió un comando tras otro cancelado")
+        except RCONNotSentError:
+            pass
+
+        assert await pool.execute("list") is not None
+        assert pool.connections_opened == 2
+        assert server.framing_errors == 0, "El servidor cerró la conexión por paquetes mezclados"
+    finally:
+        pool.close()
+        await server.stop()
+
+
+async def bench_connect_per_command(server: FakeRCONServer, n: int) -> float:
+    """Referencia: el patrón anterior de connect + login por comando"""
+    start = time.perf_counter()
+    for i in range(n):
+        client = AsyncRCONClient(server.host, server.port, server.password)
+        await client.connect()
+        await client.run(f"say {i}")
+        client.close()
+    return n / (time.perf_counter() - start)
+
+
+async def main(commands: int) -> None:
+    print(f"encode:            {bench_encode(commands * 20):>12,.0f} paquetes/s")
+    print(f"decode:            {bench_decode(commands * 20):>12,.0f} paquetes/s")
+
+    await check_cancelled_command()
+
+    server = await FakeRCONServer().start()
+    try:
+        roundtrip = await bench_roundtrip(server, commands)
+        per_command = await bench_connect_per_command(server, max(commands // 20, 10))
+    finally:
+        await server.stop()
+
+    print(f"connect+login/cmd: {per_command:>12,.0f} comandos/s")
+    print(f"secuencial:        {roundtrip['sequential']:>12,.0f} comandos/s")
+    print(f"concurrente:       {roundtrip['concurrent']:>12,.0f} comandos/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commands", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.commands))
@@ -0,0 +1,171 @@
+"""
+Benchmark de throughput RCON contra el servidor falso local.
+
+Mide RCONService y las rutas /minecraft/* (vía ASGI, sin red) a
+concurrencia creciente y muestra latencias p50/p95/p99 y comandos/s.
+Sirve para comparar cambios de pooling/pipelining sin tocar el servidor
+de producción.
+
+Uso:
+    python -m benchmarks.rcon_throughput [--requests 2000] [--latency-ms 0.5]
+"""
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from app.core.auth import TokenData, get_current_user
+from app.core.config import settings
+from app.core.rate_limit import rate_limiter, TokenBucket
+from app.main import app
+from app.services.rcon_service import RCONService, rcon_service
+from benchmarks.fake_rcon_server import FakeRCONServer
+
+CONCURRENCY_LEVELS = (1, 8, 32, 128)
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+async def run_level(call: Callable[[int], Awaitable[None]], total: int, concurrency: int) -> Dict:
+    """Lanza `total` llamadas repartidas entre `concurrency` workers"""
+    latencies: List[float] = []
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        for i in counter:
+            start = time.perf_counter()
+            await call(i)
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "per_second": total / elapsed,
+    }
+
+
+def print_table(title: str, rows: List[Dict]) -> None:
+    print(f"\n{title}")
+    print(f"{'concurrencia':>12} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'cmd/s':>10}")
+    for row in rows:
+        print(
+            f"{row['concurrency']:>12} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} "
+            f"{row['p99_ms']:>9.2f} {row['per_second']:>10,.0f}"
+        )
+
+
+async def bench_service(server: FakeRCONServer, total: int) -> None:
+    service = RCONService()
+    service.pool.host, service.pool.port = server.host, server.port
+
+    async def call(i: int) -> None:
+        response = await service.execute(f"whitelist add bench{i}")
+        assert not response.startswith("Error"), response
+
+    rows = [await run_level(call, total, c) for c in CONCURRENCY_LEVELS]
+    service.close()
+    print_table("RCONService.execute", rows)
+
+    print()
+    for parallel in (False, True):
+        service = RCONService()
+        service.pool.host, service.pool.port = server.host, server.port
+        started = time.perf_counter()
+        results = await service.execute_batch([f"whitelist add batch{i}" for i in range(total)], parallel)
+        elapsed = time.perf_counter() - started
+        service.close()
+        assert all(r["success"] for r in results)
+        mode = "parallel" if parallel else "en orden"
+        print(f"RCONService.execute_batch ({mode}): {total} comandos en {elapsed * 1000:.1f} ms "
+              f"({total / elapsed:,.0f} cmd/s)")
+
+
+async def check_priority(server: FakeRCONServer, backlog: int = 40) -> None:
+    """
+    Un comando interactivo lanzado detrás de un lote en paralelo solo espera
+    a los comandos ya enviados (uno por conexión), no a todo el lote.
+    """
+    service = RCONService()
+    service.pool.host, service.pool.port = server.host, server.port
+    server.online.append("prioridad")
+    batch = asyncio.create_task(
+        service.execute_batch([f"whitelist add cola{i}" for i in range(backlog)], parallel=True)
+    )
+    await asyncio.sleep(server.latency * 2)
+    started = time.perf_counter()
+    response = await service.execute("kick prioridad")
+    waited = time.perf_counter() - started
+    assert not batch.done(), "El lote terminó antes que el comando interactivo"
+    await batch
+    service.close()
+
+    assert response.startswith("Kicked"), response
+    # Los ya enviados (uno por conexión) más el propio kick
+    limit = (service.pool.size + 1.5) * server.latency
+    assert waited <= limit, f"kick esperó {waited * 1000:.1f} ms detrás del lote (máximo {limit * 1000:.1f} ms)"
+    print(f"kick detrás de un lote de {backlog}: {waited * 1000:.1f} ms")
+
+
+async def bench_routes(server: FakeRCONServer, total: int) -> None:
+    # El benchmark mide RCON, no auth ni rate limiting
+    app.dependency_overrides[get_current_user] = lambda: TokenData("bench", "admin")
+    unlimited = (1e9, 1e9)
+    rate_limiter.limits = {"operator": unlimited, "admin": unlimited}
+    rate_limiter.global_bucket = TokenBucket(*unlimited)
+    rcon_service.pool.host, rcon_service.pool.port = server.host, server.port
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def command(i: int) -> None:
+            r = await client.post("/minecraft/command", json={"command": f"say {i}"})
+            assert r.status_code == 200, r.text
+
+        async def players(i: int) -> None:
+            r = await client.get("/minecraft/players")
+            assert r.status_code == 200, r.text
+
+        rows = [await run_level(command, total, c) for c in CONCURRENCY_LEVELS]
+        print_table("POST /minecraft/command", rows)
+
+        rows = [await run_level(players, total, c) for c in CONCURRENCY_LEVELS]
+        print_table("GET /minecraft/players", rows)
+
+    rcon_service.close()
+    app.dependency_overrides.clear()
+
+
+async def main(args: argparse.Namespace) -> None:
+    server = await FakeRCONServer(
+        password=settings.RCON_PASSWORD,
+        latency=args.latency_ms / 1000,
+        players=10,
+    ).start()
+    try:
+        await bench_service(server, args.requests)
+        if server.latency:
+            await check_priority(server)
+        await bench_routes(server, args.route_requests)
+    finally:
+        await server.stop()
+    print(f"\nServidor falso: {server.commands_received} comandos, {server.logins} logins")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de throughput RCON")
+    parser.add_argument("--requests", type=int, default=2000, help="comandos por nivel (servicio)")
+    parser.add_argument("--route-requests", type=int, default=500, help="peticiones por nivel (rutas)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="latencia simulada por comando")
+    asyncio.run(main(parser.parse_args()))
@@ -3,15 +3,17 @@ import sys
 # Esto asegura que Python encuentre la carpeta 'app'
 sys.path.append(os.getcwd())
 
-from app.core.database import SessionLocal, engine, Base
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.init_db import init_db
+from app.core import hashing
 from app.models.user import User
-from passlib.context import CryptContext
 
-# Configuramos el hash de contraseña
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Mismas rondas que la API: sin esto el hash se rehace en el primer login
+hashing.configure(settings.HASH_ROUNDS or hashing.calibrate(settings.HASH_TARGET_MS))
 
 # Creamos las tablas por si no existen
-Base.metadata.create_all(bind=engine)
+init_db()
 
 db = SessionLocal()
 
@@ -19,13 +21,11 @@ try:
     # Verificamos si ya existe el admin
     admin_exists = db.query(User).filter(User.username == "admin").first()
     if not admin_exists:
-        hashed_password = pwd_context.hash("admin123")
-        # Nota: He puesto 'roles' porque tu auth.py anterior lo usaba en plural
+        # Mismo esquema y parámetros que usa la API (app/core/hashing.py)
         new_user = User(
             username="admin", 
-            hashed_password=hashed_password, 
-            roles="admin", 
-            is_active=True
+            password_hash=hashing.hash_password("admin123"), 
+            roles="admin"
         )
         db.add(new_user)
         db.commit()
@@ -33,4 +33,4 @@ try:
     else:
         print("ℹ️ El usuario 'admin' ya existe en la base de datos.")
 finally:
-    db.close()
\ No newline at end of file
+    db.close()
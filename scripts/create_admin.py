@@ -1,8 +1,12 @@
+from app.core.config import settings
 from app.core.database import SessionLocal
 from app.core.auth import get_password_hash
+from app.core import hashing
 from app.models.user import User
 
 def create_admin():
+    # Mismas rondas que la API: sin esto el hash se rehace en el primer login
+    hashing.configure(settings.HASH_ROUNDS or hashing.calibrate(settings.HASH_TARGET_MS))
     db = SessionLocal()
 
     if db.query(User).filter(User.username == "admin").first():